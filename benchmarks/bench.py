@@ -0,0 +1,164 @@
+"""
+Benchmark harness for the globus CLI.
+
+Runs CLI commands in-process against the fakes in benchmarks/fakes.py at
+increasing scales, recording wall time, API call counts, and peak memory.
+Results can be saved as a baseline and compared against on later runs:
+
+    python benchmarks/bench.py --save-baseline
+    python benchmarks/bench.py --compare
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from unittest import mock
+
+HERE = Path(__file__).parent
+sys.path.insert(0, str(HERE.parent))
+
+# isolate the settings file from the real one before the package reads it
+os.environ["HOME"] = tempfile.mkdtemp(prefix="globus-bench-")
+
+from click.testing import CliRunner  # noqa: E402
+
+from benchmarks import fakes  # noqa: E402
+from globus import cli as globus_cli  # noqa: E402
+
+RESULTS_DIR = HERE / "results"
+BASELINE_PATH = RESULTS_DIR / "baseline.json"
+
+SCALES = [10, 1_000, 100_000]
+
+
+def scenarios(scale):
+    """Yield (name, args, transfer_client_kwargs, schedd_kwargs) for one scale."""
+    specs = [f"/src/{idx}:/dst/{idx}" for idx in range(scale)]
+    yield "transfer", ["transfer", "source", "destination", *specs], {}, {}
+    yield "manifest", ["manifest", "endpoint", "--compact"], {"listing_size": scale}, {}
+    yield "history", ["history", "--limit", str(scale)], {"num_tasks": scale}, {}
+    yield "status", ["status"], {}, {"num_jobs": min(scale, 10_000)}
+    yield "release", ["release"], {}, {"num_jobs": min(scale, 10_000)}
+    yield "wait", ["wait", "task-id"], {}, {}
+
+
+def run_one(args, latency, transfer_client_kwargs, schedd_kwargs):
+    tc = fakes.FakeTransferClient(latency=latency, **transfer_client_kwargs)
+    schedd = fakes.FakeSchedd(latency=latency, **schedd_kwargs)
+    chirp = fakes.FakeChirp(latency=latency)
+
+    patches = [
+        mock.patch.object(globus_cli, "setup_logging", lambda verbose: None),
+        mock.patch.object(globus_cli, "get_transfer_client_or_exit", lambda *a, **kw: tc),
+        mock.patch("htcondor.Schedd", lambda *a, **kw: schedd),
+        mock.patch("htchirp.HTChirp", lambda *a, **kw: chirp),
+    ]
+    for p in patches:
+        p.start()
+
+    runner = CliRunner()
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = runner.invoke(globus_cli.cli, args, catch_exceptions=True)
+    finally:
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        for p in reversed(patches):
+            p.stop()
+
+    if result.exit_code != 0:
+        print(f"  warning: exited with code {result.exit_code}: {result.output[-500:]}")
+        if result.exception is not None and not isinstance(result.exception, SystemExit):
+            print(f"  exception: {result.exception!r}")
+
+    return {
+        "wall_time": elapsed,
+        "api_calls": tc.total_calls + schedd.total_calls + chirp.total_calls,
+        "api_calls_by_method": dict(tc.calls + schedd.calls + chirp.calls),
+        "peak_memory": peak,
+        "exit_code": result.exit_code,
+    }
+
+
+def run_all(scales, latency, only=None):
+    results = {}
+    for scale in scales:
+        for name, args, tc_kwargs, schedd_kwargs in scenarios(scale):
+            if only and name not in only:
+                continue
+            key = f"{name}@{scale}"
+            print(f"running {key}")
+            results[key] = run_one(args, latency, tc_kwargs, schedd_kwargs)
+            r = results[key]
+            print(
+                f"  {r['wall_time']:.4f}s, {r['api_calls']} calls, {r['peak_memory'] / 1024:.1f} KiB peak"
+            )
+    return results
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for key, r in results.items():
+        b = baseline.get(key)
+        if b is None:
+            continue
+        for metric in ("wall_time", "api_calls", "peak_memory"):
+            if b[metric] == 0:
+                continue
+            ratio = r[metric] / b[metric]
+            marker = " <-- regression" if ratio > threshold else ""
+            if marker:
+                regressions.append((key, metric))
+            print(
+                f"{key:>24} {metric:>12}: {b[metric]:>14.4f} -> {r[metric]:>14.4f} ({ratio:.2f}x){marker}"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=SCALES)
+    parser.add_argument(
+        "--latency", type=float, default=0, help="Seconds of simulated latency per API call."
+    )
+    parser.add_argument("--only", nargs="+", help="Only run these scenarios.")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.25,
+        help="Ratio above which a metric counts as a regression.",
+    )
+    parser.add_argument("--output", type=Path, default=RESULTS_DIR / "latest.json")
+    args = parser.parse_args()
+
+    results = run_all(args.scales, args.latency, only=args.only)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2))
+
+    if args.save_baseline:
+        BASELINE_PATH.write_text(json.dumps(results, indent=2))
+        print(f"Saved baseline to {BASELINE_PATH}")
+
+    if args.compare:
+        if not BASELINE_PATH.exists():
+            print(f"No baseline found at {BASELINE_PATH}; run with --save-baseline first")
+            return 1
+        regressions = compare(results, json.loads(BASELINE_PATH.read_text()), args.threshold)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""
+Local stand-ins for the Globus Transfer API, the HTCondor schedd, and chirp.
+
+The fakes only implement the parts of each interface that the CLI actually
+uses. Every call is counted so that the benchmark harness can report how many
+API round-trips a command made, and every call can be delayed by a fixed
+latency to simulate talking to a remote service.
+"""
+
+import collections
+import itertools
+import time
+import uuid
+
+
+class CallCounter:
+    def __init__(self, latency=0):
+        self.latency = latency
+        self.calls = collections.Counter()
+
+    def _call(self, name):
+        self.calls[name] += 1
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    @property
+    def total_calls(self):
+        return sum(self.calls.values())
+
+
+class FakeResponse(dict):
+    @property
+    def data(self):
+        return self
+
+
+class FakeTransferClient(CallCounter):
+    def __init__(self, latency=0, listing_size=100, num_tasks=25, endpoints_active=True):
+        super().__init__(latency=latency)
+        self.listing_size = listing_size
+        self.num_tasks = num_tasks
+        self.endpoints_active = endpoints_active
+        self.submitted = []
+
+    # TransferData asks for a submission id when it is constructed
+    def get_submission_id(self):
+        self._call("get_submission_id")
+        return FakeResponse(value=str(uuid.uuid4()))
+
+    def get_endpoint(self, endpoint):
+        self._call("get_endpoint")
+        return FakeResponse(
+            id=endpoint,
+            display_name=f"endpoint {endpoint}",
+            activated=self.endpoints_active,
+            expires_in=3600,
+        )
+
+    def endpoint_autoactivate(self, endpoint, **params):
+        self._call("endpoint_autoactivate")
+        return FakeResponse(code="AlreadyActivated")
+
+    def operation_ls(self, endpoint_id, **params):
+        self._call("operation_ls")
+        return [
+            FakeResponse(
+                DATA_TYPE="file",
+                name=f"file_{idx:08d}",
+                type="file",
+                size=idx * 1024,
+                last_modified="2020-01-01 00:00:00+00:00",
+                permissions="0644",
+                user="user",
+                group="group",
+            )
+            for idx in range(self.listing_size)
+        ]
+
+    def task_list(self, num_results=10, **params):
+        self._call("task_list")
+        for idx in range(min(num_results, self.num_tasks)):
+            yield FakeResponse(
+                task_id=str(uuid.UUID(int=idx)),
+                label=None if idx % 2 else f"task-{idx}",
+                status=("ACTIVE", "SUCCEEDED", "FAILED")[idx % 3],
+                source_endpoint="source",
+                destination_endpoint="destination",
+                completion_time="2020-01-01 00:00:00+00:00",
+            )
+
+    def submit_transfer(self, data):
+        self._call("submit_transfer")
+        self.submitted.append(data)
+        return FakeResponse(code="Accepted", task_id=str(uuid.uuid4()))
+
+    def task_wait(self, task_id, timeout=10, polling_interval=10):
+        self._call("task_wait")
+        return True
+
+    def get_task(self, task_id, **params):
+        self._call("get_task")
+        return FakeResponse(task_id=task_id, status="SUCCEEDED")
+
+
+class FakeSchedd(CallCounter):
+    def __init__(self, num_jobs=10, held_fraction=0.5, latency=0):
+        super().__init__(latency=latency)
+        self.ads = [
+            make_job_ad(idx, held=idx < num_jobs * held_fraction) for idx in range(num_jobs)
+        ]
+
+    def query(self, constraint="true", projection=None, **kwargs):
+        self._call("query")
+        return [dict(ad) for ad in self.ads]
+
+    def act(self, action, constraint):
+        self._call("act")
+
+    def edit(self, constraint, key, value):
+        self._call("edit")
+
+
+class FakeChirp(CallCounter):
+    def __init__(self, latency=0):
+        super().__init__(latency=latency)
+        self.attributes = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+    def set_job_attr(self, key, value):
+        self._call("set_job_attr")
+        self.attributes[key] = value
+
+
+_cluster_ids = itertools.count(1)
+
+
+def make_job_ad(idx, held=False):
+    now = int(time.time())
+    cluster_id = next(_cluster_ids)
+    return {
+        "ClusterId": cluster_id,
+        "ProcId": 0,
+        "Owner": "user",
+        "IsGlobusJob": True,
+        "JobBatchName": f"globus transfer source destination /a/{idx}:/b/{idx}",
+        "JobStatus": 5 if held else 1,
+        "HoldReason": "globus command failed" if held else None,
+        "JobUniverse": 12,
+        "QDate": now - 3600,
+        "EnteredCurrentStatus": now - 60,
+        "Iwd": "/tmp",
+        "Out": f"globus_job_{cluster_id}_0.out",
+        "Err": f"globus_job_{cluster_id}_0.err",
+        "UserLog": f"/tmp/globus_job_{cluster_id}_0.log",
+    }
@@ -0,0 +1,91 @@
+"""
+Compare the JSON and binary manifest formats on synthetic listings:
+file size, write time, load time, and time to sum all file sizes.
+
+    python benchmarks/manifest_format.py --scales 10000 1000000
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from globus.binmanifest import BinaryManifest, json_to_binary  # noqa: E402
+
+
+def make_entries(n):
+    for idx in range(n):
+        yield {
+            "DATA_TYPE": "file",
+            "name": f"dir_{idx // 1000:05d}/file_{idx:09d}.dat",
+            "type": "file",
+            "size": idx * 4096,
+            "last_modified": "2020-02-18 17:11:13+00:00",
+            "permissions": "0644",
+            "user": "user",
+            "group": "group",
+        }
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def bench(n, tmp):
+    json_path = tmp / f"manifest_{n}.json"
+    bin_path = tmp / f"manifest_{n}.bin"
+
+    _, json_write = timed(
+        lambda: json_path.write_text(
+            json.dumps(list(make_entries(n)), indent=None, separators=(",", ":"))
+        )
+    )
+    _, bin_write = timed(lambda: json_to_binary(make_entries(n), bin_path))
+
+    entries, json_load = timed(lambda: json.loads(json_path.read_text()))
+    _, json_sum = timed(lambda: sum(e["size"] for e in entries))
+    del entries
+
+    manifest, bin_load = timed(lambda: BinaryManifest(bin_path))
+    _, bin_sum = timed(lambda: sum(manifest.columns["size"]))
+    manifest.close()
+
+    return {
+        "json": {
+            "bytes": json_path.stat().st_size,
+            "write": json_write,
+            "load": json_load,
+            "sum_sizes": json_sum,
+        },
+        "binary": {
+            "bytes": bin_path.stat().st_size,
+            "write": bin_write,
+            "load": bin_load,
+            "sum_sizes": bin_sum,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.scales:
+            r = bench(n, Path(tmp))
+            print(f"{n} entries")
+            for fmt, m in r.items():
+                print(
+                    f"  {fmt:>6}: {m['bytes'] / 2**20:8.2f} MiB, write {m['write']:.3f}s, load {m['load']:.4f}s, sum sizes {m['sum_sizes']:.4f}s"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+import asyncio
+import concurrent.futures
+import functools
+import logging
+import posixpath
+
+from . import constants
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+
+def run(coro, concurrency=constants.ASYNC_CONCURRENCY):
+    """
+    Run a coroutine to completion on a fresh event loop and return its result.
+
+    This is the bridge between the synchronous CLI and the asynchronous
+    helpers in this module. Blocking Globus SDK calls are run on a thread pool
+    of size ``concurrency``, which is shut down when the coroutine finishes.
+    """
+    loop = asyncio.new_event_loop()
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=concurrency)
+    loop.set_default_executor(executor)
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+        executor.shutdown(wait=False)
+
+
+class AsyncTransferClient:
+    """
+    Wraps a synchronous :class:`globus_sdk.TransferClient`, running its
+    methods on the event loop's executor with at most ``concurrency`` calls in
+    flight at once. Any attribute of the wrapped client can be called through
+    :meth:`call`; the methods used by the CLI have their own shortcuts.
+    """
+
+    def __init__(self, transfer_client, concurrency=constants.ASYNC_CONCURRENCY):
+        self.transfer_client = transfer_client
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def call(self, method, *args, timeout=None, **kwargs):
+        func = functools.partial(getattr(self.transfer_client, method), *args, **kwargs)
+        async with self._semaphore:
+            logger.debug(f"Calling {method} with args {args} and kwargs {kwargs}")
+            future = asyncio.get_event_loop().run_in_executor(None, func)
+            return await asyncio.wait_for(future, timeout=timeout)
+
+    async def get_endpoint(self, endpoint, **kwargs):
+        return await self.call("get_endpoint", endpoint, **kwargs)
+
+    async def endpoint_autoactivate(self, endpoint, **kwargs):
+        return await self.call("endpoint_autoactivate", endpoint, **kwargs)
+
+    async def operation_ls(self, endpoint, **kwargs):
+        return await self.call("operation_ls", endpoint, **kwargs)
+
+    async def get_task(self, task_id, **kwargs):
+        return await self.call("get_task", task_id, **kwargs)
+
+    async def cancel_task(self, task_id, **kwargs):
+        return await self.call("cancel_task", task_id, **kwargs)
+
+    async def submit_transfer(self, data, **kwargs):
+        return await self.call("submit_transfer", data, **kwargs)
+
+    async def submit_delete(self, data, **kwargs):
+        return await self.call("submit_delete", data, **kwargs)
+
+
+async def gather_dict(coros, return_exceptions=False):
+    """
+    Like :func:`asyncio.gather`, but takes and returns dictionaries,
+    so that results stay attached to their keys.
+    """
+    keys = list(coros.keys())
+    results = await asyncio.gather(*coros.values(), return_exceptions=return_exceptions)
+    return dict(zip(keys, results))
+
+
+async def get_endpoints(atc, endpoints):
+    """
+    Look up many endpoints at once. Returns a dictionary mapping each
+    endpoint to its information, or to the exception raised looking it up.
+    """
+    return await gather_dict(
+        {e: atc.get_endpoint(e) for e in set(endpoints)}, return_exceptions=True
+    )
+
+
+async def activate_endpoints(atc, endpoints):
+    """
+    Concurrently look up every endpoint and try to autoactivate the inactive
+    ones. Returns the list of endpoints that still need manual activation.
+    """
+    infos = await get_endpoints(atc, endpoints)
+    for info in infos.values():
+        if isinstance(info, Exception):
+            raise info
+    inactive = [e for e, info in infos.items() if info["activated"] is not True]
+
+    responses = await gather_dict({e: atc.endpoint_autoactivate(e) for e in inactive})
+    return [e for e, response in responses.items() if response["code"] == "AutoActivationFailed"]
+
+
+async def autoactivate(atc, endpoints, **kwargs):
+    return await gather_dict(
+        {e: atc.endpoint_autoactivate(e, **kwargs) for e in set(endpoints)}, return_exceptions=True,
+    )
+
+
+async def wait_for_task(atc, task_id, interval=10, on_update=None):
+    """
+    Poll a task until it is no longer active, then return its final status.
+    If given, ``on_update`` is called with the task document after every poll,
+    on the executor; it may be called from several threads at once.
+    Wrap in :func:`asyncio.wait_for` to time out.
+    """
+    while True:
+        task = await atc.get_task(task_id)
+        if on_update is not None:
+            # on_update may block (it can write to the job ad), so keep it off the loop
+            await asyncio.get_event_loop().run_in_executor(None, on_update, task)
+        if task["status"] != constants.TASK_ACTIVE_STATUS:
+            logger.debug(f"Task {task_id} is no longer active, with status {task['status']}")
+            return task["status"]
+        await asyncio.sleep(interval)
+
+
+async def wait_for_tasks(atc, task_ids, timeout, interval=10, on_update=None):
+    """
+    Wait for many tasks at once, each with its own timeout.
+    Returns a dictionary mapping each task id to its final status,
+    ``None`` if it timed out, or the exception raised while waiting for it.
+    """
+
+    async def wait_one(task_id):
+        try:
+            return await asyncio.wait_for(
+                wait_for_task(atc, task_id, interval, on_update=on_update), timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            logger.debug(f"Timed out waiting for task {task_id} after {timeout} seconds")
+            return None
+
+    return await gather_dict({t: wait_one(t) for t in task_ids}, return_exceptions=True)
+
+
+async def submission_ids(atc, n):
+    """Get ``n`` submission ids at once, for building many task documents."""
+    responses = await asyncio.gather(*(atc.call("get_submission_id") for _ in range(n)))
+    return [r["value"] for r in responses]
+
+
+async def get_tasks(atc, task_ids):
+    return await gather_dict({t: atc.get_task(t) for t in task_ids}, return_exceptions=True)
+
+
+async def submit_all(atc, datas, method="submit_transfer"):
+    """
+    Submit many task documents at once.
+    Returns a list of responses (or exceptions) in the same order as ``datas``.
+    """
+    return await asyncio.gather(*(atc.call(method, d) for d in datas), return_exceptions=True)
+
+
+async def cancel_tasks(atc, task_ids):
+    return await gather_dict({t: atc.cancel_task(t) for t in task_ids}, return_exceptions=True)
+
+
+async def ls_recursive(atc, endpoint, path, max_depth=None):
+    """
+    List a directory tree, listing up to the client's concurrency limit of
+    directories at once. Returns every entry in the tree, with each entry's
+    ``name`` replaced by its path relative to ``path``.
+    """
+    entries = []
+
+    async def walk(relative, depth):
+        listing = await atc.operation_ls(endpoint, path=posixpath.join(path, relative))
+
+        children = []
+        for entry in listing:
+            entry = dict(entry)
+            entry["name"] = posixpath.join(relative, entry["name"])
+            entries.append(entry)
+
+            if entry["type"] == "dir" and (max_depth is None or depth < max_depth):
+                children.append(walk(entry["name"], depth + 1))
+
+        await asyncio.gather(*children)
+
+    await walk("", 0)
+    return entries
+
+
+async def ls_many(atc, endpoint, path, relatives):
+    """
+    List many directories under ``path`` at once. Returns a dictionary mapping
+    each relative path to its listing, with each entry's ``name`` replaced by
+    its path relative to ``path``.
+    """
+    listings = await gather_dict(
+        {r: atc.operation_ls(endpoint, path=posixpath.join(path, r)) for r in relatives}
+    )
+    return {
+        r: [dict(entry, name=posixpath.join(r, entry["name"])) for entry in listing]
+        for r, listing in listings.items()
+    }
+
+
+async def list_directories(atc, endpoint, paths):
+    """
+    List many directories at once. Returns a dictionary mapping each path to
+    a list of ``(name, is_dir)`` pairs, or to ``None`` if it could not be listed.
+    """
+    listings = await gather_dict(
+        {p: atc.operation_ls(endpoint, path=p + "/") for p in paths}, return_exceptions=True,
+    )
+    return {
+        p: None
+        if isinstance(listing, Exception)
+        else [(e["name"], e["type"] == "dir") for e in listing]
+        for p, listing in listings.items()
+    }
+
+
+async def stat_paths(atc, endpoint, paths):
+    """
+    Look up the listing entries for many paths at once by listing each
+    distinct parent directory a single time. Returns a dictionary mapping each
+    path to its entry, or to ``None`` if it does not exist.
+    """
+    parents = {}
+    for path in paths:
+        parent, name = posixpath.split(path.rstrip("/"))
+        parents.setdefault(parent or "/", {})[name] = path
+
+    listings = await gather_dict(
+        {parent: atc.operation_ls(endpoint, path=parent) for parent in parents},
+        return_exceptions=True,
+    )
+
+    entries = {path: None for path in paths}
+    for parent, listing in listings.items():
+        if isinstance(listing, Exception):
+            logger.debug(f"Could not list {parent}: {listing}")
+            continue
+
+        names = parents[parent]
+        for entry in listing:
+            if entry["name"] in names:
+                entries[names[entry["name"]]] = dict(entry)
+
+    return entries
+
+
+async def measure_paths(atc, endpoint, paths, recursive=False):
+    """
+    Count the files, directories, and bytes under each path.
+    Directories are only descended into if ``recursive`` is true.
+    Returns a dictionary mapping each path to a dictionary with keys
+    ``files``, ``dirs``, and ``size``, or to ``None`` if it does not exist.
+    """
+    entries = await stat_paths(atc, endpoint, paths)
+
+    async def measure(path, entry):
+        if entry is None:
+            return None
+
+        if entry["type"] != "dir":
+            return {"files": 1, "dirs": 0, "size": entry["size"]}
+
+        counts = {"files": 0, "dirs": 1, "size": 0}
+        if recursive:
+            for child in await ls_recursive(atc, endpoint, path):
+                if child["type"] == "dir":
+                    counts["dirs"] += 1
+                else:
+                    counts["files"] += 1
+                    counts["size"] += child["size"]
+        return counts
+
+    return await gather_dict({path: measure(path, entry) for path, entry in entries.items()})
+
+
+def run_with(transfer_client, func, *args, **kwargs):
+    """
+    Run one of the coroutine functions in this module (which all take an
+    :class:`AsyncTransferClient` as their first argument) from synchronous
+    code, wrapping the given synchronous ``transfer_client``.
+    """
+
+    async def main():
+        return await func(AsyncTransferClient(transfer_client), *args, **kwargs)
+
+    return run(main())
@@ -0,0 +1,167 @@
+import concurrent.futures
+import logging
+import os
+import statistics
+import time
+
+from .utils import lazy_import
+
+htcondor = lazy_import("htcondor")
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+
+IDLE, RUNNING, HELD, DONE = "idle", "running", "held", "done"
+
+
+class JobTimeline:
+    """
+    Accumulates how long a single job spent idle, running, and held,
+    from the events in its user log.
+    """
+
+    def __init__(self, cluster, proc):
+        self.cluster = cluster
+        self.proc = proc
+        self.submitted_at = None
+        self.first_started_at = None
+        self.finished_at = None
+        self.state = None
+        self.state_since = None
+        self.totals = {IDLE: 0, RUNNING: 0, HELD: 0}
+        self.hold_count = 0
+        self.run_count = 0
+
+    def _enter(self, state, timestamp):
+        if self.state in self.totals and self.state_since is not None:
+            self.totals[self.state] += max(0, timestamp - self.state_since)
+        self.state = state
+        self.state_since = timestamp
+
+    def feed(self, event):
+        t = event.timestamp
+        et = event.type
+
+        if et == htcondor.JobEventType.SUBMIT:
+            self.submitted_at = t
+            self._enter(IDLE, t)
+        elif et == htcondor.JobEventType.EXECUTE:
+            if self.first_started_at is None:
+                self.first_started_at = t
+            self.run_count += 1
+            self._enter(RUNNING, t)
+        elif et == htcondor.JobEventType.JOB_HELD:
+            self.hold_count += 1
+            self._enter(HELD, t)
+        elif et in (htcondor.JobEventType.JOB_RELEASED, htcondor.JobEventType.JOB_EVICTED):
+            self._enter(IDLE, t)
+        elif et == htcondor.JobEventType.JOB_TERMINATED:
+            # cron jobs go back to the queue after each run, but the wait for the
+            # next scheduled run is not counted; a later EXECUTE moves them on
+            self.finished_at = t
+            self._enter(DONE, t)
+        elif et == htcondor.JobEventType.JOB_ABORTED:
+            self.finished_at = t
+            self._enter(DONE, t)
+
+    def close(self, now):
+        """Account for time spent in the current state, up to ``now``."""
+        if self.state in self.totals:
+            self._enter(self.state, now)
+
+    def summary(self):
+        queue_wait = (
+            self.first_started_at - self.submitted_at
+            if self.first_started_at is not None and self.submitted_at is not None
+            else None
+        )
+        return {
+            "job": f"{self.cluster}.{self.proc}",
+            "state": self.state,
+            "queue_wait": queue_wait,
+            "idle_time": self.totals[IDLE],
+            "run_time": self.totals[RUNNING],
+            "runs": self.run_count,
+            "holds": self.hold_count,
+            "held_time": self.totals[HELD],
+            "mean_time_to_release": self.totals[HELD] / self.hold_count
+            if self.hold_count
+            else None,
+        }
+
+
+def analyze_log(path, now=None):
+    """
+    Stream the events of one user log and return a summary for each job in it.
+    """
+    now = now if now is not None else time.time()
+    timelines = {}
+    try:
+        for event in htcondor.JobEventLog(str(path)).events(stop_after=0):
+            key = (event.cluster, event.proc)
+            if key not in timelines:
+                timelines[key] = JobTimeline(*key)
+            timelines[key].feed(event)
+    except (OSError, RuntimeError) as e:
+        logger.warning(f"Could not read event log {path}: {e}")
+
+    summaries = []
+    for timeline in timelines.values():
+        timeline.close(now)
+        summary = timeline.summary()
+        summary["log"] = str(path)
+        summaries.append(summary)
+    return summaries
+
+
+def analyze_logs(paths, workers=None):
+    """
+    Analyze many user logs in parallel processes.
+    Returns a flat list of per-job summaries.
+    """
+    paths = [str(p) for p in paths]
+    now = time.time()
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(paths) < 2:
+        return [s for p in paths for s in analyze_log(p, now)]
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        chunksize = max(1, len(paths) // (workers * 4))
+        results = pool.map(analyze_log, paths, [now] * len(paths), chunksize=chunksize)
+        return [s for summaries in results for s in summaries]
+
+
+AGGREGATED_METRICS = ["queue_wait", "idle_time", "run_time", "holds", "held_time"]
+
+
+def aggregate(summaries):
+    """
+    Compute the count, mean, median, and maximum of each metric over jobs.
+    """
+    rows = []
+    for metric in AGGREGATED_METRICS:
+        values = [s[metric] for s in summaries if s[metric] is not None]
+        rows.append(
+            {
+                "metric": metric,
+                "jobs": len(values),
+                "mean": statistics.mean(values) if values else None,
+                "median": statistics.median(values) if values else None,
+                "max": max(values) if values else None,
+            }
+        )
+
+    held = sum(1 for s in summaries if s["holds"] > 0)
+    rows.append(
+        {
+            "metric": "ever_held",
+            "jobs": len(summaries),
+            "mean": held / len(summaries) if summaries else None,
+            "median": None,
+            "max": None,
+        }
+    )
+    return rows
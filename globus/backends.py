@@ -0,0 +1,259 @@
+import errno
+import hashlib
+import logging
+import os
+import shutil
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from . import constants
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+# os.copy_file_range is only available on Linux with Python 3.8+
+_copy_file_range = getattr(os, "copy_file_range", None)
+_sendfile = getattr(os, "sendfile", None)
+
+_KERNEL_COPY_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF}
+
+SYNC_LEVELS = {"exists": 0, "size": 1, "mtime": 2, "checksum": 3}
+
+# how symlinks inside recursive items are handled: skipped, or copied as the files they point to
+RECURSIVE_SYMLINKS = ["ignore", "copy"]
+
+# outcomes of transferring a single file
+TRANSFERRED = "transferred"
+SKIPPED = "skipped"
+SOURCE_ERROR = "source error"
+ERROR = "error"
+
+
+class BackendError(Exception):
+    pass
+
+
+class LocalBackend:
+    """
+    Performs transfers between endpoints whose storage is also mounted on
+    this machine, by copying files directly instead of routing the data
+    through Globus. ``roots`` maps endpoint ids to the local directory that
+    the endpoint's ``/`` corresponds to.
+
+    Takes the same task documents (:class:`globus_sdk.TransferData`) as
+    Globus does, and honors their sync level, timestamp preservation,
+    checksum verification, source error skipping and symlink handling
+    (except for keeping symlinks as symlinks).
+    """
+
+    name = "local"
+
+    def __init__(self, roots, workers=constants.LOCAL_COPY_WORKERS):
+        self.roots = {endpoint: Path(root) for endpoint, root in roots.items()}
+        self.workers = workers
+
+    def can_transfer(self, source_endpoint, destination_endpoint):
+        return source_endpoint in self.roots and destination_endpoint in self.roots
+
+    def local_path(self, endpoint, path):
+        """Map a path on an endpoint to the local filesystem."""
+        root = self.roots[endpoint]
+        if path.startswith("~"):
+            # the endpoint's home directory is the local user's home directory
+            path = os.path.expanduser(path)
+
+        local = Path(os.path.normpath(root / path.lstrip("/")))
+        if local != root and root not in local.parents:
+            raise BackendError(f"Path {path} is outside of the local root {root} of {endpoint}")
+        return local
+
+    def plan(self, tdata):
+        """
+        Expand the items of a task document into ``(source, destination)``
+        pairs of local files, without touching the destination.
+        Returns ``(pairs, directories, faults)``, where ``directories`` are the
+        destination directories that recursive items need, even if empty.
+        """
+        symlinks = tdata.get("recursive_symlinks") or "ignore"
+        if symlinks not in RECURSIVE_SYMLINKS:
+            raise BackendError(f"The local backend does not support recursive_symlinks {symlinks}")
+        follow = symlinks == "copy"
+
+        pairs = []
+        directories = []
+        faults = []
+        for item in tdata["DATA"]:
+            src = self.local_path(tdata["source_endpoint"], item["source_path"])
+            dst = self.local_path(tdata["destination_endpoint"], item["destination_path"])
+
+            if not item.get("recursive"):
+                pairs.append((src, dst))
+                continue
+
+            def on_error(e):
+                faults.append({"path": e.filename, "error": e.strerror, "source": True})
+
+            for dirpath, _, filenames in os.walk(src, onerror=on_error, followlinks=follow):
+                relative = Path(dirpath).relative_to(src)
+                directories.append(dst / relative)
+                for filename in filenames:
+                    path = Path(dirpath) / filename
+                    if not follow and path.is_symlink():
+                        logger.debug(f"Ignoring symlink {path}")
+                        continue
+                    pairs.append((path, dst / relative / filename))
+
+        return pairs, directories, faults
+
+    def run(self, tdata):
+        """
+        Perform the transfer described by a task document, blocking until it
+        is done. Returns a task-like document describing the result.
+        """
+        start = time.monotonic()
+        sync_level = tdata.get("sync_level")
+        if isinstance(sync_level, str):
+            sync_level = SYNC_LEVELS[sync_level]
+        options = dict(
+            sync_level=sync_level,
+            preserve_timestamp=tdata.get("preserve_timestamp", False),
+            verify_checksum=tdata.get("verify_checksum", False),
+        )
+
+        pairs, directories, faults = self.plan(tdata)
+        for directory in directories:
+            try:
+                directory.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                faults.append({"path": str(directory), "error": e.strerror, "source": False})
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            results = list(pool.map(lambda pair: _transfer_file(*pair, **options), pairs))
+
+        transferred = [detail for outcome, detail in results if outcome == TRANSFERRED]
+        skipped = sum(1 for outcome, _ in results if outcome == SKIPPED)
+        faults.extend(
+            {"path": str(src), "error": detail, "source": outcome == SOURCE_ERROR}
+            for (src, _), (outcome, detail) in zip(pairs, results)
+            if outcome in (SOURCE_ERROR, ERROR)
+        )
+
+        if tdata.get("skip_source_errors", False):
+            failed = any(not f["source"] for f in faults)
+        else:
+            failed = bool(faults)
+
+        elapsed = time.monotonic() - start
+        return {
+            "task_id": f"{self.name}-{uuid.uuid4()}",
+            "label": tdata.get("label"),
+            "status": "FAILED" if failed else "SUCCEEDED",
+            "files": len(pairs),
+            "files_transferred": len(transferred),
+            "files_skipped": skipped,
+            "bytes_transferred": sum(transferred),
+            "effective_bytes_per_second": int(sum(transferred) / elapsed) if elapsed > 0 else 0,
+            "faults": faults,
+        }
+
+
+BACKENDS = {LocalBackend.name: LocalBackend}
+
+
+def _transfer_file(src, dst, sync_level, preserve_timestamp, verify_checksum):
+    """
+    Copy one file, if the sync level says it needs to be.
+    Returns ``(outcome, detail)``, where detail is the number of bytes
+    copied, or a description of the error.
+    """
+    try:
+        src_stat = src.stat()
+    except OSError as e:
+        return SOURCE_ERROR, f"could not read source: {e.strerror}"
+
+    try:
+        if _up_to_date(src, src_stat, dst, sync_level):
+            return SKIPPED, 0
+
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        partial = dst.with_name(f".{dst.name}.{uuid.uuid4().hex[:8]}.partial")
+        try:
+            _copy(src, partial, src_stat.st_size)
+            if preserve_timestamp:
+                os.utime(partial, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+            if verify_checksum and _checksum(src) != _checksum(partial):
+                return ERROR, "checksum mismatch after copying"
+            os.replace(partial, dst)
+        finally:
+            if partial.exists():
+                partial.unlink()
+    except OSError as e:
+        return ERROR, f"could not copy: {e.strerror}"
+
+    logger.debug(f"Copied {src} -> {dst} ({src_stat.st_size} bytes)")
+    return TRANSFERRED, src_stat.st_size
+
+
+def _up_to_date(src, src_stat, dst, sync_level):
+    if sync_level is None:
+        return False
+
+    try:
+        dst_stat = dst.stat()
+    except FileNotFoundError:
+        return False
+
+    if sync_level >= SYNC_LEVELS["size"] and dst_stat.st_size != src_stat.st_size:
+        return False
+    if sync_level >= SYNC_LEVELS["mtime"] and src_stat.st_mtime_ns > dst_stat.st_mtime_ns:
+        return False
+    if sync_level >= SYNC_LEVELS["checksum"] and _checksum(src) != _checksum(dst):
+        return False
+    return True
+
+
+def _checksum(path):
+    digest = hashlib.md5()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(constants.LOCAL_CHECKSUM_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _copy(src, dst, size):
+    """
+    Copy a file inside the kernel with copy_file_range (which can also
+    reflink or offload the copy on some filesystems) or sendfile, falling
+    back to copying through userspace when neither works.
+    """
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        for kernel_copy in (_copy_file_range, _sendfile):
+            if kernel_copy is None:
+                continue
+            try:
+                _kernel_copy_all(kernel_copy, fsrc.fileno(), fdst.fileno(), size)
+                return
+            except OSError as e:
+                if e.errno not in _KERNEL_COPY_UNSUPPORTED:
+                    raise
+                logger.debug(f"{kernel_copy.__name__} not supported for {src}: {e}")
+                fsrc.seek(0)
+                fdst.seek(0)
+                fdst.truncate()
+
+        shutil.copyfileobj(fsrc, fdst, constants.LOCAL_COPY_CHUNK_SIZE)
+
+
+def _kernel_copy_all(kernel_copy, src_fd, dst_fd, size):
+    offset = 0
+    while offset < size:
+        count = min(constants.LOCAL_COPY_CHUNK_SIZE, size - offset)
+        if kernel_copy is _sendfile:
+            copied = _sendfile(dst_fd, src_fd, offset, count)
+        else:
+            copied = _copy_file_range(src_fd, dst_fd, count, offset, offset)
+        if copied == 0:  # the file shrank while copying
+            break
+        offset += copied
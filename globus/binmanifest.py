@@ -0,0 +1,326 @@
+"""
+A compact, columnar binary format for directory manifests.
+
+Each entry of a manifest (as produced by the "manifest" command) is split into
+fixed-width columns. Names, parent directories, permissions, users, and groups
+are interned into a single string table, so each entry costs 33 bytes plus
+whatever new strings it introduces. Files are written in a streaming fashion
+(columns and strings are spilled to temporary files as entries arrive, and
+only a bounded number of recently-seen strings are remembered for interning)
+and read through ``mmap``, so neither side ever holds the whole manifest in
+memory. A string may therefore appear in the string table more than once.
+
+Layout (all integers little-endian)::
+
+    header     magic, version, entry count, string count, section offsets
+    strings    (n_strings + 1) x u64 offsets into the string data, then the data
+    name       n x u32  string id of the entry's base name
+    dir        n x u32  string id of the entry's parent directory ("" for the top level)
+    type       n x u8   index into ENTRY_TYPES
+    size       n x u64
+    mtime      n x i64  seconds since the epoch (UTC)
+    perms      n x u32  string id
+    user       n x u32  string id
+    group      n x u32  string id
+"""
+
+import array
+import datetime
+import functools
+import json
+import logging
+import mmap
+import posixpath
+import shutil
+import struct
+import sys
+import tempfile
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+MAGIC = b"GTMF"
+VERSION = 1
+ENTRY_TYPES = ["file", "dir", "link", "other"]
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# name, typecode (must match struct/memoryview formats), item size
+COLUMNS = [
+    ("name", "I", 4),
+    ("dir", "I", 4),
+    ("type", "B", 1),
+    ("size", "Q", 8),
+    ("mtime", "q", 8),
+    ("perms", "I", 4),
+    ("user", "I", 4),
+    ("group", "I", 4),
+]
+SECTIONS = ["string_offsets", "string_data"] + [name for name, _, _ in COLUMNS]
+HEADER = struct.Struct("<4sHHQQ" + "Q" * len(SECTIONS))
+ALIGNMENT = 8
+FLUSH_EVERY = 65536
+INTERN_TABLE_SIZE = 65536
+
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+def is_binary_manifest(path):
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_timestamp(value):
+    # Globus always reports timestamps in UTC, like "2020-02-18 17:11:13+00:00"
+    if not value:
+        return 0
+    dt = datetime.datetime.strptime(value[:19], TIMESTAMP_FORMAT)
+    return int(dt.replace(tzinfo=datetime.timezone.utc).timestamp())
+
+
+def format_timestamp(seconds):
+    dt = datetime.datetime.fromtimestamp(seconds, tz=datetime.timezone.utc)
+    return dt.strftime(TIMESTAMP_FORMAT) + "+00:00"
+
+
+class BinaryManifestWriter:
+    """
+    Write a binary manifest one entry at a time. Use as a context manager,
+    or call :meth:`close` when done; nothing is written to ``path`` until then.
+    """
+
+    def __init__(self, path, intern_table_size=INTERN_TABLE_SIZE):
+        self.path = path
+        self._count = 0
+        self._spills = {name: tempfile.TemporaryFile() for name, _, _ in COLUMNS}
+        self._buffers = {name: array.array(typecode) for name, typecode, _ in COLUMNS}
+
+        # the string table is streamed out like the columns; only the most
+        # recently interned strings are remembered, to bound memory use
+        self._intern_table_size = intern_table_size
+        self._strings = {}
+        self._n_strings = 0
+        self._string_bytes = 0
+        self._spills["string_offsets"] = tempfile.TemporaryFile()
+        self._spills["string_data"] = tempfile.TemporaryFile()
+        self._buffers["string_offsets"] = array.array("Q", [0])
+        self._string_data = []
+        self._intern("")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._discard()
+
+    def _intern(self, s):
+        s = "" if s is None else str(s)
+        idx = self._strings.get(s)
+        if idx is None:
+            if len(self._strings) >= self._intern_table_size:
+                self._strings.clear()
+            idx = self._strings[s] = self._n_strings
+            self._n_strings += 1
+
+            data = s.encode("utf-8")
+            self._string_bytes += len(data)
+            self._string_data.append(data)
+            self._buffers["string_offsets"].append(self._string_bytes)
+        return idx
+
+    def write(self, entry):
+        directory, name = posixpath.split(entry["name"])
+        kind = entry.get("type", "file")
+        intern = self._intern
+        b = self._buffers
+
+        b["name"].append(intern(name))
+        b["dir"].append(intern(directory))
+        b["type"].append(ENTRY_TYPES.index(kind) if kind in ENTRY_TYPES else len(ENTRY_TYPES) - 1)
+        b["size"].append(entry.get("size") or 0)
+        b["mtime"].append(parse_timestamp(entry.get("last_modified")))
+        b["perms"].append(intern(entry.get("permissions")))
+        b["user"].append(intern(entry.get("user")))
+        b["group"].append(intern(entry.get("group")))
+
+        self._count += 1
+        if self._count % FLUSH_EVERY == 0:
+            self._flush()
+
+    def _flush(self):
+        for name, buffer in self._buffers.items():
+            if not _LITTLE_ENDIAN:
+                buffer.byteswap()
+            buffer.tofile(self._spills[name])
+            del buffer[:]
+
+        self._spills["string_data"].write(b"".join(self._string_data))
+        del self._string_data[:]
+
+    def _discard(self):
+        for spill in self._spills.values():
+            spill.close()
+
+    def close(self):
+        self._flush()
+
+        sizes = {
+            "string_offsets": (self._n_strings + 1) * 8,
+            "string_data": self._string_bytes,
+        }
+        for name, _, itemsize in COLUMNS:
+            sizes[name] = self._count * itemsize
+
+        offsets = {}
+        position = HEADER.size
+        for section in SECTIONS:
+            position = _align(position)
+            offsets[section] = position
+            position += sizes[section]
+
+        with open(self.path, "wb") as f:
+            f.write(
+                HEADER.pack(
+                    MAGIC,
+                    VERSION,
+                    0,
+                    self._count,
+                    self._n_strings,
+                    *(offsets[section] for section in SECTIONS),
+                )
+            )
+            for section in SECTIONS:
+                f.write(b"\0" * (offsets[section] - f.tell()))
+                spill = self._spills[section]
+                spill.seek(0)
+                shutil.copyfileobj(spill, f)
+                spill.close()
+
+        logger.debug(
+            f"Wrote binary manifest with {self._count} entries and {self._n_strings} strings to {self.path}"
+        )
+
+
+def _align(position):
+    return (position + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+class BinaryManifest:
+    """
+    Read a binary manifest through ``mmap``.
+
+    Entries are decoded lazily: indexing or iterating yields dictionaries in
+    the same form as the JSON manifest, while the raw columns (e.g.
+    ``manifest.columns["size"]``) can be used directly for fast aggregation
+    without decoding any strings.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, self._count, self._n_strings, *offsets = HEADER.unpack_from(
+            self._mmap, 0
+        )
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a binary manifest")
+        if version != VERSION:
+            raise ValueError(f"{path} has unsupported binary manifest version {version}")
+        offsets = dict(zip(SECTIONS, offsets))
+
+        self._view = memoryview(self._mmap)
+        self._string_offsets = self._column(offsets["string_offsets"], "Q", 8, self._n_strings + 1)
+        self._string_data = offsets["string_data"]
+        self.columns = {
+            name: self._column(offsets[name], typecode, itemsize, self._count)
+            for name, typecode, itemsize in COLUMNS
+        }
+        self._string_cache = {}
+
+    def _column(self, offset, typecode, itemsize, count):
+        raw = self._view[offset : offset + itemsize * count]
+        if _LITTLE_ENDIAN:
+            return raw.cast(typecode)
+        return [v for (v,) in struct.iter_unpack("<" + typecode, raw)]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        for column in self.columns.values():
+            if isinstance(column, memoryview):
+                column.release()
+        if isinstance(self._string_offsets, memoryview):
+            self._string_offsets.release()
+        self._view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __len__(self):
+        return self._count
+
+    def string(self, idx):
+        try:
+            return self._string_cache[idx]
+        except KeyError:
+            start = self._string_data + self._string_offsets[idx]
+            end = self._string_data + self._string_offsets[idx + 1]
+            s = self._string_cache[idx] = self._mmap[start:end].decode("utf-8")
+            return s
+
+    def entry_path(self, idx):
+        return posixpath.join(
+            self.string(self.columns["dir"][idx]), self.string(self.columns["name"][idx])
+        )
+
+    def __getitem__(self, idx):
+        if not 0 <= idx < self._count:
+            raise IndexError(idx)
+
+        c = self.columns
+        return {
+            "DATA_TYPE": "file",
+            "name": self.entry_path(idx),
+            "type": ENTRY_TYPES[c["type"][idx]],
+            "size": c["size"][idx],
+            "last_modified": format_timestamp(c["mtime"][idx]),
+            "permissions": self.string(c["perms"][idx]),
+            "user": self.string(c["user"][idx]),
+            "group": self.string(c["group"][idx]),
+        }
+
+    def __iter__(self):
+        for idx in range(self._count):
+            yield self[idx]
+
+
+def json_to_binary(entries, path):
+    with BinaryManifestWriter(path) as writer:
+        for entry in entries:
+            writer.write(entry)
+
+
+def binary_to_json(path, file, compact=False):
+    """Stream a binary manifest out to ``file`` as a JSON array of entries."""
+    if compact:
+        dumps_kwargs = dict(indent=None, separators=(",", ":"))
+        sep, open_, close_ = ",", "[", "]"
+    else:
+        dumps_kwargs = dict(indent=2)
+        sep, open_, close_ = ",\n", "[\n", "\n]"
+
+    with BinaryManifest(path) as manifest:
+        file.write(open_)
+        for idx, entry in enumerate(manifest):
+            if idx > 0:
+                file.write(sep)
+            text = json.dumps(entry, **dumps_kwargs)
+            file.write(text if compact else "  " + text.replace("\n", "\n  "))
+        file.write(close_ + "\n")
@@ -1,27 +1,67 @@
+import collections
 import datetime
 import json
 import logging
+import os
+import posixpath
 import pprint
+import re
+import shlex
 import subprocess
 import sys
 import textwrap
+import time
+import uuid
 from pathlib import Path
 from urllib.parse import urlencode
 
-import classad
 import click
-import globus_sdk
-import htcondor
 import humanize
 import toml
 from click_didyoumean import DYMGroup
 
 from . import constants
+from . import release as policy
+from .analytics import aggregate, analyze_logs
+from .backends import BACKENDS, BackendError
+from .binmanifest import BinaryManifest, binary_to_json, is_binary_manifest, json_to_binary
+from .coalesce import coalesce_specs, manifest_lister
+from .completion import complete_endpoint, complete_path, complete_transfer_spec, remember_endpoints
 from .endpoints import EndpointInfo
 from .formatting import table
-from .jobs import get_globus_jobs, set_job_attr
+from .guard import current_job_ad, find_running_task, guard_key, guard_tag, record_task
+from .idempotency import FingerprintIndex, find_duplicate_task, fingerprint, fingerprint_tag
+from .jobs import (
+    Job,
+    JobLogFollower,
+    ProgressPublisher,
+    get_globus_jobs,
+    query_pool,
+    set_job_attr,
+    summarize_by_schedd,
+    summarize_by_user,
+)
+from .logtail import FileFollower, tail_lines
+from .output import emit, output_options
+from .probe import (
+    bench_file_name,
+    fit,
+    generate_files,
+    measure_task,
+    parse_size,
+    plan,
+    save_results,
+)
+from .scan import ScanIndex, changed_files, default_index_path
 from .settings import load_settings, save_settings
-from .utils import is_interactive
+from .tasks import iter_skipped_errors, transfer_data_like
+from .utils import add_label_tag, is_interactive, lazy_import, remove_label_tags
+
+aio = lazy_import("globus.aio")
+classad = lazy_import("classad")
+clients = lazy_import("globus.clients")
+globus_sdk = lazy_import("globus_sdk")
+htcondor = lazy_import("htcondor")
 
 logger = logging.getLogger("globus")
 logger.setLevel(logging.DEBUG)
@@ -30,7 +70,31 @@ logger.setLevel(logging.DEBUG)
 # CLI
 
 
-@click.group(context_settings=constants.CONTEXT_SETTINGS, cls=DYMGroup)
+class GlobusGroup(DYMGroup):
+    """
+    Exits with a distinct exit code when a command fails because the Globus
+    services are (temporarily) unreachable or overloaded, even after the
+    client's own retries, so that the auto-release policy can tell those
+    failures apart from ones that will not go away by themselves.
+    """
+
+    def invoke(self, ctx):
+        try:
+            return super().invoke(ctx)
+        except globus_sdk.NetworkError as e:
+            logger.exception("Could not reach the Globus services")
+            error(f"Could not reach the Globus services: {e}", exit_code=constants.TRANSIENT_ERROR)
+        except globus_sdk.GlobusAPIError as e:
+            if e.http_status not in constants.HTTP_RETRY_STATUS_CODES:
+                raise
+            logger.exception("The Globus services are temporarily unavailable")
+            error(
+                f"The Globus services are temporarily unavailable: {e}",
+                exit_code=constants.TRANSIENT_ERROR,
+            )
+
+
+@click.group(context_settings=constants.CONTEXT_SETTINGS, cls=GlobusGroup)
 @click.option(
     "--verbose",
     "-v",
@@ -48,11 +112,14 @@ def cli(context, verbose, as_submit_description):
     """
     Initial setup: run 'globus login' and following the printed instructions.
     """
-    setup_logging(verbose)
+    if context.obj is None:
+        setup_logging(verbose)
 
-    context.obj = load_settings()
+        context.obj = load_settings()
 
-    logger.debug(f'{sys.argv[0]} called with arguments "{" ".join(sys.argv[1:])}"')
+        logger.debug(f'{sys.argv[0]} called with arguments "{" ".join(sys.argv[1:])}"')
+    elif as_submit_description:
+        error(f"{constants.AS_JOB} can not be used inside a batch")
 
     if as_submit_description:
         exe, *args = sys.argv
@@ -74,7 +141,7 @@ def cli(context, verbose, as_submit_description):
             request_disk = 1GB
 
             on_exit_hold = ExitCode =!= 0
-            on_exit_hold_reason = "globus command failed; try running `globus release` or looking at job logs for more information"
+            on_exit_hold_reason = strcat("globus command failed with exit code ", ExitCode, "; try running `globus release` or looking at job logs for more information")
 
             should_transfer_files = NO
             transfer_executable = False
@@ -83,6 +150,7 @@ def cli(context, verbose, as_submit_description):
 
             +IsGlobusJob = True
             +IsTransferJob = {'transfer' in args_string}
+            +GlobusEndpoints = "{','.join(endpoints_in_command(context, args))}"
             +WantIOProxy = True
 
             cron_prep_time = 300
@@ -94,6 +162,98 @@ def cli(context, verbose, as_submit_description):
         sys.exit(0)
 
 
+@cli.command()
+@click.argument("script", type=click.File("r"), default="-")
+@click.option(
+    "--keep-going/--stop-on-error",
+    default=False,
+    help="Whether to keep running commands after one fails. Defaults to stopping.",
+)
+@click.pass_context
+def batch(context, script, keep_going):
+    """
+    Run many commands in one process.
+
+    Commands are read from SCRIPT (or stdin, if it is not given), one per line,
+    written exactly as they would be on the command line but without the
+    leading "globus". Blank lines and lines starting with # are ignored.
+    Settings and the transfer client are shared between all of the commands,
+    so authentication only happens once.
+
+    After all of the commands have run (or one has failed, unless
+    --keep-going is passed), a summary of the exit code and run time of each
+    command is printed to stderr. The exit code is non-zero if any command failed.
+
+    Commands that need interactive input (like "bookmarks clear") can not
+    read it from stdin when the script itself is read from stdin.
+    """
+    results = []
+    for line_number, line in enumerate(script, start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+
+        exit_code, elapsed = run_batch_command(context, line)
+        results.append(
+            {
+                "line": line_number,
+                "command": line,
+                "exit_code": exit_code,
+                "time": f"{elapsed:.2f}s",
+            }
+        )
+
+        if exit_code != 0 and not keep_going:
+            logger.error(f"Command on line {line_number} failed, stopping batch")
+            break
+
+    click.secho(
+        table(
+            headers=["line", "command", "exit_code", "time"],
+            rows=results,
+            alignment=constants.BATCH_COLUMN_ALIGNMENTS,
+            header_fmt=constants.BOLD_HEADER,
+            style=lambda row: {"fg": "green" if row["exit_code"] == 0 else "red"},
+        ),
+        err=True,
+    )
+
+    if any(r["exit_code"] != 0 for r in results):
+        sys.exit(constants.BATCH_ERROR)
+
+
+def run_batch_command(context, line):
+    logger.debug(f"Running batch command {line}")
+
+    start = time.monotonic()
+    try:
+        args = shlex.split(line)
+    except ValueError as e:
+        click.secho(f"Error: could not parse command: {e}", err=True, fg="red")
+        return 1, time.monotonic() - start
+
+    try:
+        with cli.make_context("globus", args, parent=context) as sub_context:
+            cli.invoke(sub_context)
+        exit_code = 0
+    except SystemExit as e:
+        exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except click.exceptions.Exit as e:
+        exit_code = e.exit_code
+    except click.ClickException as e:
+        e.show()
+        exit_code = e.exit_code
+    except click.Abort:
+        click.secho("Aborted!", err=True)
+        exit_code = 1
+    except Exception as e:
+        logger.exception(f"Batch command {line} raised an unexpected exception")
+        click.secho(f"Error: {e}", err=True, fg="red")
+        exit_code = 1
+
+    return exit_code, time.monotonic() - start
+
+
 # SETTINGS COMMANDS
 
 
@@ -161,12 +321,18 @@ def enable_autocomplete(shell, force, destination):
     Note that your Python
     environment must be available (i.e., running "globus" must work) by the time
     the autocompletion-enabling command runs in your shell configuration file.
+
+    Endpoint arguments complete to bookmarks and to endpoints previously shown
+    by the "endpoints" command. Paths (--path and transfer specifications)
+    complete to remote directory listings, which are cached for a minute;
+    if a listing is not cached and the endpoint does not answer quickly,
+    no completions are offered.
     """
     cmd, dst = {
         "bash": (r'eval "$(_GLOBUS_COMPLETE=source_bash globus)"', Path.home() / ".bashrc",),
         "zsh": (r'eval "$(_GLOBUS_COMPLETE=source_zsh globus)"', Path.home() / ".zshrc",),
         "fish": (
-            r"eval (env _GLOBUS_COMPLETE=source_fish foo-bar)",
+            r"eval (env _GLOBUS_COMPLETE=source_fish globus)",
             Path.home() / ".config" / "fish" / "completions" / "globus.fish",
         ),
     }[shell]
@@ -289,26 +455,25 @@ def clear(settings):
 
 
 @bookmarks.command()
+@output_options(constants.DEFAULT_BOOKMARKS_HEADERS)
 @click.pass_obj
-def ls(settings):
+def ls(settings, output_format, columns):
     """
     List endpoint bookmarks.
     """
-    rows = [{"bookmark": k, "endpoint": v} for k, v in settings[constants.BOOKMARKS].items()]
+    rows = ({"bookmark": k, "endpoint": v} for k, v in settings[constants.BOOKMARKS].items())
 
-    click.secho(
-        table(
-            headers=["bookmark", "endpoint"],
-            rows=rows,
-            header_fmt=constants.BOLD_HEADER,
-            alignment=constants.BOOKMARKS_LS_COLUMN_ALIGNMENTS,
-        )
-    )
+    emit(rows, output_format, columns, alignment=constants.BOOKMARKS_LS_COLUMN_ALIGNMENTS)
 
 
 def endpoint_arg(*args, **kwargs):
     def _(func):
-        return click.argument(*args, callback=_map_endpoint_through_bookmarks, **kwargs)(func)
+        return click.argument(
+            *args,
+            callback=_map_endpoint_through_bookmarks,
+            autocompletion=complete_endpoint,
+            **kwargs,
+        )(func)
 
     return _
 
@@ -323,30 +488,78 @@ def _map_endpoint_through_bookmarks(ctx, param, value):
         return value
 
 
+@cli.group()
+def local_roots():
+    """
+    Subcommand group for managing where endpoints are mounted locally.
+
+    Transfers between endpoints that both have a local root can be performed
+    by the local engine (see "globus transfer --backend").
+    """
+    pass
+
+
+@local_roots.command()
+@endpoint_arg("endpoint")
+@click.argument("root", type=click.Path(exists=True, file_okay=False, resolve_path=True))
+@click.pass_obj
+def add(settings, endpoint, root):
+    """
+    Set the local directory that an endpoint's / corresponds to.
+    """
+    settings[constants.LOCAL_ROOTS][endpoint] = root
+
+    save_settings(settings)
+
+
+@local_roots.command()
+@endpoint_arg("endpoint")
+@click.pass_obj
+def rm(settings, endpoint):
+    """
+    Remove the local root of an endpoint.
+    """
+    try:
+        settings[constants.LOCAL_ROOTS].pop(endpoint)
+    except KeyError:
+        error(f"No local root found for endpoint {endpoint}")
+
+    save_settings(settings)
+
+
+@local_roots.command()
+@output_options(constants.DEFAULT_LOCAL_ROOTS_HEADERS)
+@click.pass_obj
+def ls(settings, output_format, columns):
+    """
+    List the local roots of endpoints.
+    """
+    rows = ({"endpoint": k, "root": v} for k, v in settings[constants.LOCAL_ROOTS].items())
+
+    emit(rows, output_format, columns, alignment=constants.LOCAL_ROOTS_LS_COLUMN_ALIGNMENTS)
+
+
 # ENDPOINT COMMANDS
 
 
 @cli.command()
 @click.option("--limit", type=int, default=25, help="How many results to get.")
+@output_options(constants.DEFAULT_ENDPOINTS_HEADERS)
 @click.pass_obj
-def endpoints(settings, limit):
+def endpoints(settings, limit, output_format, columns):
     """
     List endpoints.
     """
     tc = get_transfer_client_or_exit(settings[constants.AUTH].get(constants.REFRESH_TOKEN))
 
-    endpoints = list(tc.endpoint_search(filter_scope="my-endpoints", num_results=limit))
-
-    click.secho(
-        table(
-            headers=constants.DEFAULT_ENDPOINTS_HEADERS,
-            rows=endpoints,
-            alignment=constants.ENDPOINTS_COLUMN_ALIGNMENTS,
-            header_fmt=constants.BOLD_HEADER,
-        )
+    endpoints = remember_endpoints(
+        tc.endpoint_search(filter_scope="my-endpoints", num_results=limit)
     )
 
-    click.secho("\nWeb View: https://app.globus.org/endpoints")
+    emit(endpoints, output_format, columns, alignment=constants.ENDPOINTS_COLUMN_ALIGNMENTS)
+
+    if output_format == "table":
+        click.secho("\nWeb View: https://app.globus.org/endpoints")
 
 
 @cli.command()
@@ -366,82 +579,131 @@ def info(settings, endpoint):
 
 
 def history_style(row):
-    fg = {"ACTIVE": "blue", "SUCCEEDED": "green", "FAILED": "red"}[row["status"]]
+    fg = {"ACTIVE": "blue", "SUCCEEDED": "green", "FAILED": "red"}.get(row.get("status"))
 
     return {"fg": fg}
 
 
 @cli.command()
 @click.option("--limit", type=int, default=25, help="How many results to get.")
+@output_options(constants.DEFAULT_HISTORY_HEADERS)
 @click.pass_obj
-def history(settings, limit):
+def history(settings, limit, output_format, columns):
     """
     List transfer events.
     """
     tc = get_transfer_client_or_exit(settings[constants.AUTH].get(constants.REFRESH_TOKEN))
-    tasks = [task.data for task in tc.task_list(num_results=limit)]
-    for task in tasks:
-        if task["label"] is None:
-            task.pop("label")
-
-    click.secho(
-        table(
-            headers=constants.DEFAULT_HISTORY_HEADERS,
-            rows=tasks,
-            alignment=constants.HISTORY_COLUMN_ALIGNMENTS,
-            header_fmt=constants.BOLD_HEADER,
-            style=history_style,
-        )
+    tasks = tc.task_list(num_results=limit)
+
+    emit(
+        tasks,
+        output_format,
+        columns,
+        alignment=constants.HISTORY_COLUMN_ALIGNMENTS,
+        style=history_style,
     )
-    click.secho("\nWeb View: https://app.globus.org/activity?show=history")
+
+    if output_format == "table":
+        click.secho("\nWeb View: https://app.globus.org/activity?show=history")
+
+
+def recursive_option(func):
+    return click.option(
+        "--recursive",
+        "-r",
+        is_flag=True,
+        help="List the entire directory tree, with names relative to --path. Subdirectories are listed concurrently.",
+    )(func)
+
+
+def list_directory(transfer_client, endpoint, path, recursive=False):
+    if recursive:
+        return aio.run_with(transfer_client, aio.ls_recursive, endpoint, path)
+
+    return list(transfer_client.operation_ls(endpoint, path=path))
+
+
+def iter_directory(transfer_client, endpoint, path, recursive=False):
+    """
+    Like :func:`list_directory`, but yields entries as they are listed,
+    a batch of directories at a time, so the whole tree is never in memory.
+    """
+    if not recursive:
+        yield from transfer_client.operation_ls(endpoint, path=path)
+        return
+
+    pending = collections.deque([""])
+    while pending:
+        batch = [pending.popleft() for _ in range(min(len(pending), constants.LS_BATCH_SIZE))]
+        listings = aio.run_with(transfer_client, aio.ls_many, endpoint, path, batch)
+        for relative in batch:
+            for entry in listings[relative]:
+                if entry["type"] == "dir":
+                    pending.append(entry["name"])
+                yield entry
 
 
 @cli.command()
 @endpoint_arg("endpoint")
 @click.option(
-    "--path", type=str, default="~/", help="The path to list the contents of. Defaults to '~/'.",
+    "--path",
+    type=str,
+    default="~/",
+    autocompletion=complete_path,
+    help="The path to list the contents of. Defaults to '~/'.",
 )
+@recursive_option
+@output_options(constants.DEFAULT_LS_HEADERS)
 @click.pass_obj
-def ls(settings, endpoint, path):
+def ls(settings, endpoint, path, recursive, output_format, columns):
     """
     List the directory contents of a path on an endpoint.
 
-    This command is intended to produce human-readable output. The "manifest"
-    command is more useful as part of a workflow.
+    By default this command produces human-readable output; use --format
+    to get JSON, newline-delimited JSON, or CSV instead. The "manifest"
+    command is also useful as part of a workflow.
     """
     tc = get_transfer_client_or_exit(settings[constants.AUTH].get(constants.REFRESH_TOKEN))
 
     activate_endpoints_or_exit(tc, [endpoint])
 
-    entries = list(tc.operation_ls(endpoint, path=path))
-    click.secho(
-        table(
-            headers=constants.DEFAULT_LS_HEADERS,
-            rows=entries,
-            alignment=constants.LS_COLUMN_ALIGNMENTS,
-            header_fmt=constants.BOLD_HEADER,
-        )
-    )
+    entries = iter_directory(tc, endpoint, path, recursive)
+
+    emit(entries, output_format, columns, alignment=constants.LS_COLUMN_ALIGNMENTS)
 
 
 @cli.command()
 @endpoint_arg("endpoint")
 @click.option(
-    "--path", type=str, default="~/", help="The path to list the contents of. Defaults to '~/'.",
+    "--path",
+    type=str,
+    default="~/",
+    autocompletion=complete_path,
+    help="The path to list the contents of. Defaults to '~/'.",
 )
 @click.option(
     "--verbose/--compact",
     default=True,
     help="Whether the JSON representation should be verbose or compact. The default is verbose.",
 )
+@recursive_option
+@click.option(
+    "--binary",
+    type=click.Path(dir_okay=False, writable=True, resolve_path=True),
+    help="Write a compact binary manifest to this file instead of printing JSON.",
+)
 @click.pass_obj
-def manifest(settings, endpoint, path, verbose):
+def manifest(settings, endpoint, path, verbose, recursive, binary):
     """
     Print a JSON manifest of directory contents on an endpoint.
 
     The manifest can be printed in verbose, human-readable JSON or in compact,
     hard-for-humans JSON. Use --compact if you are worried about the size of
     the manifest. Otherwise, use --verbose (which is the default).
+
+    For very large trees, use --binary to write a much smaller columnar binary
+    manifest to a file instead. Binary manifests can be converted to and from
+    JSON with the "manifest-convert" command.
     """
     if verbose:
         json_dumps_kwargs = dict(indent=2)
@@ -452,10 +714,41 @@ def manifest(settings, endpoint, path, verbose):
 
     activate_endpoints_or_exit(tc, [endpoint])
 
-    entries = list(tc.operation_ls(endpoint, path=path))
+    if binary is not None:
+        json_to_binary(iter_directory(tc, endpoint, path, recursive), binary)
+        return
+
+    entries = list_directory(tc, endpoint, path, recursive)
+
     click.secho(json.dumps(entries, **json_dumps_kwargs))
 
 
+@cli.command()
+@click.argument("input", type=click.Path(exists=True, dir_okay=False))
+@click.argument("output", type=click.Path(dir_okay=False, writable=True, allow_dash=True))
+@click.option(
+    "--verbose/--compact",
+    default=True,
+    help="Whether JSON output should be verbose or compact. The default is verbose.",
+)
+def manifest_convert(input, output, verbose):
+    """
+    Convert a manifest between the JSON and binary formats.
+
+    If INPUT is a binary manifest, it is converted to JSON (OUTPUT may be -
+    to print it). Otherwise INPUT is read as JSON and converted to a binary
+    manifest.
+    """
+    if is_binary_manifest(input):
+        with click.open_file(output, mode="w") as f:
+            binary_to_json(input, f, compact=not verbose)
+    else:
+        if output == "-":
+            error("Binary manifests can not be written to stdout")
+        with open(input) as f:
+            json_to_binary(json.load(f), output)
+
+
 @cli.command()
 @endpoint_arg("endpoint")
 @click.pass_obj
@@ -499,26 +792,81 @@ def wait_args(func):
     return func
 
 
+def transfer_data_options(func):
+    decorators = [
+        click.option(
+            "--from-file",
+            "from_files",
+            type=click.File("r"),
+            multiple=True,
+            help="Read additional transfer specifications from this file (or - for stdin), one per line. May be passed multiple times.",
+        ),
+        click.option("--label", help="A label for the transfer."),
+        click.option(
+            "--sync-level",
+            type=click.Choice(["exists", "size", "mtime", "checksum"], case_sensitive=False),
+            default="checksum",
+            help="How to decide whether to actually transfer a file or not. Defaults to checksum.",
+        ),
+        click.option(
+            "--preserve-timestamps/--no-preserve-timestamps",
+            default=True,
+            help="Whether to preserve file modification timestamps. Defaults to preserve them.",
+        ),
+        click.option(
+            "--verify-checksums/--no-verify-checksums",
+            default=True,
+            help="Whether to check that file checksums are the same at source and destination after transferring. Defaults to verify. Think very hard before turning this off.",
+        ),
+        click.option(
+            "--skip-source-errors",
+            is_flag=True,
+            help="Skip over files and directories that can not be read at the source instead of failing the task. They can be retried later with the retry command.",
+        ),
+    ]
+
+    for d in reversed(decorators):
+        func = d(func)
+
+    return func
+
+
 @cli.command()
 @endpoint_arg("source_endpoint")
 @endpoint_arg("destination_endpoint")
-@click.argument("transfers", nargs=-1)
-@click.option("--label", help="A label for the transfer.")
+@click.argument("transfers", nargs=-1, autocompletion=complete_transfer_spec)
+@transfer_data_options
 @click.option(
-    "--sync-level",
-    type=click.Choice(["exists", "size", "mtime", "checksum"], case_sensitive=False),
-    default="checksum",
-    help="How to decide whether to actually transfer a file or not. Defaults to checksum.",
+    "--if-running",
+    type=click.Choice(constants.GUARD_POLICIES, case_sensitive=False),
+    default=None,
+    help="What to do if the task submitted by a previous run of this transfer is still running. Defaults to skip inside cron jobs and ignore otherwise.",
 )
 @click.option(
-    "--preserve-timestamps/--no-preserve-timestamps",
-    default=True,
-    help="Whether to preserve file modification timestamps. Defaults to preserve them.",
+    "--coalesce",
+    is_flag=True,
+    help="Replace file transfer specifications that together cover entire source directories with single recursive directory transfers.",
 )
 @click.option(
-    "--verify-checksums/--no-verify-checksums",
-    default=True,
-    help="Whether to check that file checksums are the same at source and destination after transferring. Defaults to verify. Think very hard before turning this off.",
+    "--coalesce-manifest",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Check directory coverage for --coalesce against this recursive manifest (JSON or binary) of the source instead of listing the source directories.",
+)
+@click.option(
+    "--coalesce-manifest-root",
+    default="~/",
+    help="The --path the --coalesce-manifest was made with. Defaults to '~/'.",
+)
+@click.option(
+    "--idempotent",
+    is_flag=True,
+    help="If an identical transfer was submitted recently and is still running or succeeded, print its task_id instead of submitting a new task.",
+)
+@click.option(
+    "--backend",
+    type=click.Choice(constants.TRANSFER_BACKENDS, case_sensitive=False),
+    default="globus",
+    help="What performs the transfer: Globus, the local engine (see 'globus local-roots'), or the local engine if both endpoints have local roots and Globus otherwise. Defaults to globus.",
 )
 @click.option("--wait", is_flag=True, help="If passed, wait for the transfer to complete.")
 @wait_args
@@ -528,10 +876,18 @@ def transfer(
     source_endpoint,
     destination_endpoint,
     transfers,
+    from_files,
     label,
     sync_level,
     preserve_timestamps,
     verify_checksums,
+    skip_source_errors,
+    if_running,
+    coalesce,
+    coalesce_manifest,
+    coalesce_manifest_root,
+    idempotent,
+    backend,
     wait,
     timeout,
     interval,
@@ -572,13 +928,87 @@ def transfer(
     The default synchronization level is checksum. Stricter levels imply
     less-strict levels (i.e., checksum synchronization implies existence checking).
 
+    Transfer specifications can also be read from files with --from-file,
+    one per line (for example, the output of the "scan" command).
+
+    Recurring transfers (like cron jobs) can guard against starting a new task
+    while the previous run's task is still running with --if-running:
+
+        ignore: always submit a new task.
+
+        skip: do not submit a new task; exit successfully without printing anything.
+
+        wait: wait for the previous task to finish, then submit a new task.
+
+        coalesce: treat the previous task as this run's task; print its task_id
+        (and wait for it, if --wait is passed) instead of submitting a new one.
+
+    Guarded tasks are tagged in their label and recorded both on local disk
+    and (inside a job) in the job ad, so the guard works across restarts.
+
+    Generated lists of transfer specifications often name every file in a
+    directory separately. With --coalesce, whenever the file specifications
+    cover everything in a source directory (checked by listing the source,
+    or against --coalesce-manifest) and map it into one destination directory,
+    they are replaced by a single recursive directory transfer, which is much
+    faster to submit and for Globus to process. A report of how many items
+    were eliminated is printed to stderr.
+
+    With --idempotent, a fingerprint of the endpoints, transfer specifications,
+    and options is added to the task label. If a task with the same fingerprint
+    is still running or succeeded in the last day, its task_id is used instead
+    of submitting a new task, so scripts and retried jobs can safely rerun.
+
+    When both endpoints are mounted on this machine (for example, two
+    endpoints on the same shared filesystem), --backend local copies the files
+    directly with the local engine instead of routing the data through Globus.
+    The local directory that each endpoint's / corresponds to is configured
+    with "globus local-roots add". The local engine copies files in parallel
+    inside the kernel, honors the same synchronization level and options,
+    and always waits for the copy to finish; --if-running, --coalesce and
+    --idempotent do not apply to it. Its task_id starts with "local-".
+
     If --wait is passed, this command will also wait for the task to finish
     instead of immediately returning
     (see the wait command itself for the semantics of this mode and descriptions
     of the accompanying options; run "globus wait --help").
     """
+    transfers = read_transfer_specs(transfers, from_files)
+
+    engine = select_backend(settings, backend, source_endpoint, destination_endpoint)
+    if engine is not None:
+        tdata = globus_sdk.TransferData(
+            None,
+            source_endpoint,
+            destination_endpoint,
+            label=label,
+            submission_id=str(uuid.uuid4()),
+            sync_level=sync_level,
+            preserve_timestamp=preserve_timestamps,
+            verify_checksum=verify_checksums,
+            skip_source_errors=skip_source_errors,
+        )
+        add_transfer_items_or_exit(tdata, transfers)
+        run_backend_or_exit(engine, tdata)
+        return
+
+    job_ad = current_job_ad()
+    if if_running is None:
+        if_running = "skip" if job_ad is not None and Job(job_ad).is_cron else "ignore"
+
+    guard = None
+    if if_running != "ignore":
+        guard = guard_key(source_endpoint, destination_endpoint, transfers, job_ad=job_ad)
+        label = add_label_tag(label, guard_tag(guard), constants.LABEL_MAX_LENGTH)
+        logger.debug(f"Transfer guard {guard} active with policy {if_running}")
+
     tc = get_transfer_client_or_exit(settings[constants.AUTH].get(constants.REFRESH_TOKEN))
 
+    if coalesce:
+        transfers = coalesce_transfer_specs(
+            tc, source_endpoint, transfers, coalesce_manifest, coalesce_manifest_root
+        )
+
     tdata = globus_sdk.TransferData(
         tc,
         source_endpoint,
@@ -587,26 +1017,50 @@ def transfer(
         sync_level=sync_level,
         preserve_timestamp=preserve_timestamps,
         verify_checksum=verify_checksums,
+        skip_source_errors=skip_source_errors,
     )
-    for t in transfers:
-        src, dst = t.split(":")
-        if src[-1] == dst[-1] == "/":  # directory -> directory
-            logger.debug(f"Transfer directory {src} -> {dst}")
-            tdata.add_item(src, dst, recursive=True)
-        elif src[-1] == "/" or dst[-1] == "/":  # malformed directory transfer
-            logger.error(f"Invalid transfer specification: {t}")
-            error(
-                f"Invalid transfer specification '{t}' (if transferring directories, both paths must end with /)",
-                exit_code=constants.INVALID_TRANSFER_SPECIFICATION_ERROR,
-            )
-        else:  # file -> file
-            logger.debug(f"Transfer file {src} -> {dst}")
-            tdata.add_item(src, dst)
+    add_transfer_items_or_exit(tdata, transfers)
+
+    fp = None
+    if idempotent:
+        fp = fingerprint(tdata)
+        tdata["label"] = add_label_tag(
+            tdata.get("label"), fingerprint_tag(fp), constants.LABEL_MAX_LENGTH
+        )
+        logger.debug(f"Transfer fingerprint is {fp}")
 
     activate_endpoints_or_exit(tc, [source_endpoint, destination_endpoint])
 
-    result = tc.submit_transfer(tdata)
-    task_id = result["task_id"]
+    running_task_id = find_running_task(tc, guard, job_ad) if guard is not None else None
+    duplicate_task_id = find_duplicate_task(tc, fp, FingerprintIndex()) if fp is not None else None
+
+    if running_task_id is not None and if_running == "skip":
+        warning(f"Previous task {running_task_id} is still running; skipping this transfer")
+        return
+    elif running_task_id is not None and if_running == "wait":
+        logger.info(f"Waiting for previous task {running_task_id} before submitting")
+        wait_for_task_or_exit(
+            transfer_client=tc,
+            task_id=running_task_id,
+            timeout=timeout,
+            interval=interval,
+            max_attempts=attempts,
+        )
+
+    if running_task_id is not None and if_running == "coalesce":
+        logger.info(f"Coalescing this transfer into previous task {running_task_id}")
+        task_id = running_task_id
+    elif duplicate_task_id is not None:
+        logger.info(f"Identical transfer already submitted as task {duplicate_task_id}")
+        task_id = duplicate_task_id
+    else:
+        result = tc.submit_transfer(tdata)
+        task_id = result["task_id"]
+
+        if guard is not None:
+            record_task(guard, task_id, job_ad)
+        if fp is not None:
+            FingerprintIndex().add(fp, task_id)
 
     if wait:
         wait_for_task_or_exit(
@@ -620,70 +1074,1053 @@ def transfer(
     click.secho(task_id)
 
 
-# TODO: how do we check for transfer errors? e.g., directories without trailing slashes, path not existing, etc.
-
-
-@cli.command()
-@click.argument("task_id")
-@click.pass_obj
-def cancel(settings, task_id):
+def select_backend(settings, backend, source_endpoint, destination_endpoint):
     """
-    Cancel a task.
+    Get the engine that should perform a transfer,
+    or ``None`` if Globus should perform it.
     """
-    tc = get_transfer_client_or_exit(settings[constants.AUTH].get(constants.REFRESH_TOKEN))
+    if backend == "globus":
+        return None
+
+    engine = BACKENDS["local"](settings[constants.LOCAL_ROOTS])
+    if engine.can_transfer(source_endpoint, destination_endpoint):
+        logger.debug(f"Using the {engine.name} backend")
+        return engine
+
+    if backend == "auto":
+        logger.debug("Both endpoints do not have local roots, using Globus")
+        return None
+
+    roots = settings[constants.LOCAL_ROOTS]
+    missing = [e for e in (source_endpoint, destination_endpoint) if e not in roots]
+    error(
+        f"No local root configured for endpoints {' '.join(missing)}; add them with 'globus local-roots add'",
+        exit_code=constants.LOCAL_TRANSFER_ERROR,
+    )
 
+
+def run_backend_or_exit(engine, tdata):
     try:
-        result = tc.cancel_task(task_id)
-    except globus_sdk.TransferAPIError as e:
-        logger.exception(f"Task {task_id} was not successfully cancelled")
-        error(
-            f"Task {task_id} was not successfully cancelled: {e.message}",
-            exit_code=constants.CANCEL_TASK_ERROR,
-        )
+        result = engine.run(tdata)
+    except (BackendError, OSError) as e:
+        logger.exception(f"The {engine.name} backend failed")
+        error(f"Transfer failed: {e}", exit_code=constants.LOCAL_TRANSFER_ERROR)
+
+    for fault in result["faults"]:
+        warning(f"{fault['path']}: {fault['error']}")
+
+    click.secho(
+        f"{result['status']}: {result['files_transferred']} files transferred ({humanize.naturalsize(result['bytes_transferred'])} at {humanize.naturalsize(result['effective_bytes_per_second'])}/s), {result['files_skipped']} skipped, {len(result['faults'])} faults",
+        err=True,
+        fg="green" if result["status"] == "SUCCEEDED" else "red",
+    )
+
+    if result["status"] != "SUCCEEDED":
+        error(f"Task {result['task_id']} failed", exit_code=constants.LOCAL_TRANSFER_ERROR)
+
+    click.secho(result["task_id"])
+
+
+def add_transfer_items_or_exit(tdata, transfers):
+    for t in transfers:
+        src, dst = t.split(":")
+        if src[-1] == dst[-1] == "/":  # directory -> directory
+            logger.debug(f"Transfer directory {src} -> {dst}")
+            tdata.add_item(src, dst, recursive=True)
+        elif src[-1] == "/" or dst[-1] == "/":  # malformed directory transfer
+            logger.error(f"Invalid transfer specification: {t}")
+            error(
+                f"Invalid transfer specification '{t}' (if transferring directories, both paths must end with /)",
+                exit_code=constants.INVALID_TRANSFER_SPECIFICATION_ERROR,
+            )
+        else:  # file -> file
+            logger.debug(f"Transfer file {src} -> {dst}")
+            tdata.add_item(src, dst)
 
-    if result["code"] == "Canceled":
-        click.secho(f"Task {task_id} has been successfully cancelled", fg="green")
+
+def coalesce_transfer_specs(transfer_client, source_endpoint, transfers, manifest, manifest_root):
+    if manifest is not None:
+        if is_binary_manifest(manifest):
+            with BinaryManifest(manifest) as m:
+                lister = manifest_lister(m, manifest_root)
+        else:
+            with open(manifest) as f:
+                lister = manifest_lister(json.load(f), manifest_root)
     else:
-        logger.error(f"Task {task_id} was not successfully cancelled:\n{result}")
-        error(
-            f"Task {task_id} was not successfully cancelled:\n{result}",
-            exit_code=constants.CANCEL_TASK_ERROR,
-        )
+        activate_endpoints_or_exit(transfer_client, [source_endpoint])
 
+        def lister(paths):
+            return aio.run_with(transfer_client, aio.list_directories, source_endpoint, paths)
 
-@cli.command()
-@click.argument("task_id")
-@wait_args
-@click.pass_obj
-def wait(settings, task_id, timeout, interval, attempts):
-    """
-    Wait for a task to complete.
-    """
-    tc = get_transfer_client_or_exit(settings[constants.AUTH].get(constants.REFRESH_TOKEN))
+    transfers, report = coalesce_specs(transfers, lister)
 
-    wait_for_task_or_exit(
-        transfer_client=tc,
-        task_id=task_id,
-        timeout=timeout,
-        interval=interval,
-        max_attempts=attempts,
+    click.secho(
+        f"Coalesced {report['before']} transfer items into {report['after']} ({report['before'] - report['after']} eliminated, {report['directories']} directory items)",
+        err=True,
     )
 
-    click.secho(task_id)
+    return transfers
+
+
+def read_transfer_specs(transfers, from_files):
+    transfers = list(transfers)
+    for f in from_files:
+        transfers.extend(line.strip() for line in f if line.strip())
+    return transfers
 
 
 @cli.command()
-@click.option("--raw", is_flag=True, help="Print raw job ads instead of the pretty display.")
-@click.pass_obj
-def status(settings, raw):
-    """
+@endpoint_arg("source_endpoint")
+@click.argument("transfers", nargs=-1, autocompletion=complete_transfer_spec)
+@click.option(
+    "--to",
+    "destination_endpoints",
+    multiple=True,
+    required=True,
+    callback=lambda ctx, param, values: tuple(
+        _map_endpoint_through_bookmarks(ctx, param, v) for v in values
+    ),
+    autocompletion=complete_endpoint,
+    help="A destination endpoint (or bookmark). Pass once per destination.",
+)
+@transfer_data_options
+@click.option("--wait", is_flag=True, help="If passed, wait for all of the transfers to complete.")
+@wait_args
+@output_options(constants.DEFAULT_FANOUT_HEADERS)
+@click.pass_obj
+def fanout(
+    settings,
+    source_endpoint,
+    transfers,
+    destination_endpoints,
+    from_files,
+    label,
+    sync_level,
+    preserve_timestamps,
+    verify_checksums,
+    skip_source_errors,
+    wait,
+    timeout,
+    interval,
+    attempts,
+    output_format,
+    columns,
+):
+    """
+    Transfer the same files from one source endpoint to many destinations.
+
+    Takes the same transfer specifications and options as the transfer command,
+    and submits one task per --to destination endpoint. All of the endpoints
+    are activated once, concurrently, and the tasks are submitted concurrently.
+    A summary of the task for each destination is printed
+    (use --format to get it in a machine-readable format).
+
+    If --wait is passed, this command will also wait for all of the tasks
+    to finish before printing the summary (see "globus wait --help").
+    """
+    transfers = read_transfer_specs(transfers, from_files)
+    destination_endpoints = list(dict.fromkeys(destination_endpoints))
+
+    tc = get_transfer_client_or_exit(settings[constants.AUTH].get(constants.REFRESH_TOKEN))
+
+    activate_endpoints_or_exit(tc, [source_endpoint, *destination_endpoints])
+
+    submission_ids = aio.run_with(tc, aio.submission_ids, len(destination_endpoints))
+
+    tdatas = []
+    for destination_endpoint, submission_id in zip(destination_endpoints, submission_ids):
+        tdata = globus_sdk.TransferData(
+            tc,
+            source_endpoint,
+            destination_endpoint,
+            label=label,
+            submission_id=submission_id,
+            sync_level=sync_level,
+            preserve_timestamp=preserve_timestamps,
+            verify_checksum=verify_checksums,
+            skip_source_errors=skip_source_errors,
+        )
+        add_transfer_items_or_exit(tdata, transfers)
+        tdatas.append(tdata)
+
+    results = aio.run_with(tc, aio.submit_all, tdatas)
+
+    task_ids = {}
+    for destination_endpoint, result in zip(destination_endpoints, results):
+        if isinstance(result, Exception):
+            logger.error(f"Failed to submit transfer to {destination_endpoint}: {result}")
+            warning(f"Failed to submit transfer to {destination_endpoint}: {result}")
+            continue
+        task_ids[destination_endpoint] = result["task_id"]
+
+    # wait without exiting on a timeout, so that the summary is still printed
+    unfinished, errored = [], False
+    if wait and task_ids:
+        unfinished, errored = wait_for_tasks_with_attempts(
+            transfer_client=tc,
+            task_ids=list(task_ids.values()),
+            timeout=timeout,
+            interval=interval,
+            max_attempts=attempts,
+        )
+        if unfinished:
+            logger.error(f"Timed out waiting for tasks {' '.join(unfinished)}")
+            warning(
+                f"Timed out waiting for tasks {' '.join(unfinished)} after {attempts} attempts."
+            )
+
+    tasks = aio.run_with(tc, aio.get_tasks, list(task_ids.values()))
+    rows = []
+    for destination_endpoint in destination_endpoints:
+        task_id = task_ids.get(destination_endpoint)
+        task = tasks.get(task_id) if task_id is not None else None
+        row = {"destination": destination_endpoint, "task_id": task_id}
+        if task is not None and not isinstance(task, Exception):
+            row.update(getattr(task, "data", task))
+        row["status"] = row.get("status") or "NOT SUBMITTED"
+        rows.append(row)
+
+    emit(
+        rows,
+        output_format,
+        columns,
+        alignment=constants.FANOUT_COLUMN_ALIGNMENTS,
+        style=history_style,
+    )
+
+    if unfinished:
+        sys.exit(wait_exit_code(errored))
+    if len(task_ids) != len(destination_endpoints) or any(
+        row["status"] == "FAILED" for row in rows
+    ):
+        sys.exit(constants.FANOUT_ERROR)
+
+
+@cli.command()
+@click.argument("local_dir", type=click.Path(exists=True, file_okay=False, resolve_path=True))
+@click.argument("destination_path")
+@click.option(
+    "--source-path",
+    help="The path to LOCAL_DIR as seen by the Globus Connect Personal endpoint. Defaults to LOCAL_DIR itself.",
+)
+@click.option(
+    "--index",
+    type=click.Path(dir_okay=False, writable=True, resolve_path=True),
+    help="Where to store the index of previously-seen files. Defaults to a file in ~/.globus_transfer_cache/scan, unique to this combination of paths.",
+)
+@click.option(
+    "--full",
+    is_flag=True,
+    help="Ignore the index and emit every file (the index is still updated, unless --no-update-index is passed).",
+)
+@click.option(
+    "--update-index/--no-update-index",
+    default=True,
+    help="Whether to record the files seen in this scan, so that they are not emitted again unless they change. Defaults to update.",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=constants.SCAN_WORKERS,
+    help=f"How many directories to scan concurrently. Defaults to {constants.SCAN_WORKERS}.",
+)
+def scan(local_dir, destination_path, source_path, index, full, update_index, workers):
+    """
+    Emit transfer specifications for new or changed local files.
+
+    Walks LOCAL_DIR on the local disk (which should be shared by a Globus
+    Connect Personal endpoint) and prints a transfer specification, one per
+    line, for every file that is new or whose size or modification time has
+    changed since the last scan, mapping it to the same relative path under
+    DESTINATION_PATH. The output can be fed to "globus transfer --from-file -".
+
+    For example, to sync a mostly-static directory nightly:
+
+        globus scan ~/data /data/ | globus transfer laptop cluster --from-file -
+
+    The index is updated as soon as the scan finishes, so if the resulting
+    transfer fails, rerun it with the same specifications or use --full.
+    """
+    if source_path is None:
+        source_path = local_dir
+
+    if index is None:
+        index = default_index_path(local_dir, source_path, destination_path)
+
+    with ScanIndex(index) as idx:
+        count = 0
+        for path in changed_files(local_dir, idx, workers=workers, update=update_index, full=full):
+            rel = path.replace(os.sep, "/")
+            click.echo(
+                f"{posixpath.join(source_path, rel)}:{posixpath.join(destination_path, rel)}"
+            )
+            count += 1
+
+    logger.debug(f"Found {count} new or changed files under {local_dir}")
+
+
+# TODO: how do we check for transfer errors? e.g., directories without trailing slashes, path not existing, etc.
+
+
+def parse_list_option(convert):
+    def callback(ctx, param, value):
+        try:
+            return sorted({convert(v) for v in value.split(",") if v.strip()})
+        except ValueError as e:
+            raise click.BadParameter(str(e))
+
+    return callback
+
+
+@cli.command()
+@endpoint_arg("source_endpoint")
+@endpoint_arg("destination_endpoint")
+@click.option(
+    "--source-dir",
+    required=True,
+    help="The directory on the source endpoint that holds the benchmark files (see --generate).",
+)
+@click.option(
+    "--destination-dir",
+    required=True,
+    help="A scratch directory on the destination endpoint to transfer the benchmark files into.",
+)
+@click.option(
+    "--sizes",
+    default=constants.BENCH_DEFAULT_SIZES,
+    callback=parse_list_option(parse_size),
+    help=f"Comma-separated file sizes to test (e.g. 4K,100M,1G). Defaults to {constants.BENCH_DEFAULT_SIZES}.",
+)
+@click.option(
+    "--counts",
+    default=constants.BENCH_DEFAULT_COUNTS,
+    callback=parse_list_option(int),
+    help=f"Comma-separated numbers of files per transfer to test. Defaults to {constants.BENCH_DEFAULT_COUNTS}.",
+)
+@click.option(
+    "--generate",
+    type=click.Path(file_okay=False, writable=True, resolve_path=True),
+    help="Create the benchmark files in this local directory first (it should be the --source-dir of a local Globus Connect Personal endpoint).",
+)
+@click.option(
+    "--verify-checksums/--no-verify-checksums",
+    default=True,
+    help="Whether the test transfers verify checksums, like real transfers do by default. Defaults to verify.",
+)
+@click.option(
+    "--cleanup/--no-cleanup",
+    default=True,
+    help="Whether to delete the transferred files from the destination afterwards. Defaults to cleaning up.",
+)
+@click.option(
+    "--dry", is_flag=True, help="Only print the planned matrix; do not transfer anything."
+)
+@click.option(
+    "--timeout",
+    type=int,
+    default=constants.BENCH_TIMEOUT,
+    help=f"How many seconds to wait for each test transfer before cancelling it and moving on. Defaults to {constants.BENCH_TIMEOUT} seconds.",
+)
+@click.option(
+    "--interval",
+    type=int,
+    default=10,
+    help="How often the status of each test transfer is checked. Defaults to 10 seconds.",
+)
+@click.pass_obj
+def bench(
+    settings,
+    source_endpoint,
+    destination_endpoint,
+    source_dir,
+    destination_dir,
+    sizes,
+    counts,
+    generate,
+    verify_checksums,
+    cleanup,
+    dry,
+    timeout,
+    interval,
+):
+    """
+    Measure transfer throughput between two endpoints.
+
+    Runs one test transfer for every combination of --sizes and --counts,
+    one after another, and measures how long each took. From all of the
+    transfers together it estimates the fixed overhead per task, the overhead
+    per file, and the effective throughput between the endpoints.
+
+    A test transfer that does not finish within --timeout seconds is
+    cancelled and recorded as timed out, and the benchmark moves on to the
+    next one. Whatever was measured is saved and the destination is cleaned
+    up even if the benchmark fails or is interrupted.
+
+    The benchmark files must already exist in --source-dir, named
+    bench_<size in bytes>_<index>; --generate creates them locally.
+    Results are stored in ~/.globus_transfer_cache/bench so that other tools
+    can use them to pick sensible defaults.
+    """
+    cells = plan(sizes, counts)
+
+    rows = [
+        {
+            "size": humanize.naturalsize(size, binary=True),
+            "count": count,
+            "total": humanize.naturalsize(size * count, binary=True),
+        }
+        for size, count in cells
+    ]
+
+    if dry:
+        click.secho(
+            table(
+                headers=["size", "count", "total"],
+                rows=rows,
+                alignment=constants.BENCH_COLUMN_ALIGNMENTS,
+                header_fmt=constants.BOLD_HEADER,
+            )
+        )
+        return
+
+    if generate is not None:
+        generate_files(Path(generate), sizes, max(counts))
+
+    tc = get_transfer_client_or_exit(settings[constants.AUTH].get(constants.REFRESH_TOKEN))
+
+    activate_endpoints_or_exit(tc, [source_endpoint, destination_endpoint])
+
+    run_dir = posixpath.join(destination_dir, f"globus_bench_{int(time.time())}")
+    measurements = []
+    model = None
+    try:
+        for row, (size, count) in zip(rows, cells):
+            tdata = globus_sdk.TransferData(
+                tc,
+                source_endpoint,
+                destination_endpoint,
+                label=f"bench {size} x {count}",
+                verify_checksum=verify_checksums,
+            )
+            for idx in range(count):
+                name = bench_file_name(size, idx)
+                tdata.add_item(
+                    posixpath.join(source_dir, name),
+                    posixpath.join(run_dir, f"{size}_{count}", name),
+                )
+
+            task_id = tc.submit_transfer(tdata)["task_id"]
+            logger.info(f"Submitted benchmark transfer {task_id} ({row['size']} x {count})")
+
+            measurement = run_bench_cell(tc, task_id, timeout, interval)
+            measurement.update(size=size, count=count)
+            measurements.append(measurement)
+
+            row.update(
+                status=measurement["status"],
+                duration=f"{measurement['duration']:.1f}s"
+                if measurement["duration"] is not None
+                else "",
+                throughput=f"{humanize.naturalsize(measurement['bytes'] / measurement['duration'], binary=True)}/s"
+                if measurement["duration"]
+                else "",
+            )
+    finally:
+        if cleanup:
+            ddata = globus_sdk.DeleteData(
+                tc, destination_endpoint, label="bench cleanup", recursive=True
+            )
+            ddata.add_item(run_dir)
+            try:
+                tc.submit_delete(ddata)
+            except globus_sdk.GlobusError as e:
+                warning(f"Could not clean up {run_dir} on {destination_endpoint}: {e}")
+
+        click.secho(
+            table(
+                headers=constants.BENCH_HEADERS,
+                rows=rows,
+                alignment=constants.BENCH_COLUMN_ALIGNMENTS,
+                header_fmt=constants.BOLD_HEADER,
+                style=lambda row: {"fg": "green" if row.get("status") == "SUCCEEDED" else "red"},
+            )
+        )
+
+        if measurements:
+            model = fit(measurements)
+            path = save_results(source_endpoint, destination_endpoint, measurements, model)
+            click.secho(f"Results saved to {path}")
+
+    if model is None:
+        warning("Not enough successful transfers to estimate overheads and throughput")
+    else:
+        throughput = (
+            f"{humanize.naturalsize(model['throughput'], binary=True)}/s"
+            if model["throughput"]
+            else "unknown"
+        )
+        click.secho(
+            f"\nTask overhead: {model['task_overhead']:.2f}s, per-file overhead: {model['per_file_overhead']:.3f}s, throughput: {throughput}"
+        )
+
+    if any(m["status"] != "SUCCEEDED" for m in measurements):
+        sys.exit(constants.BENCH_ERROR)
+
+
+def run_bench_cell(transfer_client, task_id, timeout, interval):
+    """
+    Wait for one benchmark transfer and measure it. A transfer that does not
+    finish in time is cancelled and recorded with status TIMEOUT.
+    """
+    result = aio.run_with(
+        transfer_client, aio.wait_for_tasks, [task_id], timeout=timeout, interval=interval
+    )[task_id]
+
+    if isinstance(result, Exception):
+        logger.error(f"Could not wait for benchmark transfer {task_id}: {result}")
+        status = "ERROR"
+    elif result is None:
+        warning(f"Benchmark transfer {task_id} did not finish within {timeout} seconds")
+        try:
+            transfer_client.cancel_task(task_id)
+        except globus_sdk.TransferAPIError as e:
+            warning(f"Could not cancel benchmark transfer {task_id}: {e.message}")
+        status = "TIMEOUT"
+    else:
+        return measure_task(transfer_client.get_task(task_id))
+
+    return {
+        "task_id": task_id,
+        "status": status,
+        "files": 0,
+        "bytes": 0,
+        "duration": None,
+        "effective_bytes_per_second": None,
+    }
+
+
+@cli.command()
+@click.argument("task_id")
+@click.option("--label", help="A label for the new transfer tasks.")
+@click.option(
+    "--chunk-size",
+    type=click.IntRange(min=1),
+    default=constants.RETRY_CHUNK_SIZE,
+    help=f"How many items to put in each new task. Defaults to {constants.RETRY_CHUNK_SIZE}.",
+)
+@click.option("--wait", is_flag=True, help="If passed, wait for the new tasks to complete.")
+@wait_args
+@click.pass_obj
+def retry(settings, task_id, label, chunk_size, wait, timeout, interval, attempts):
+    """
+    Resubmit only the files that a finished task skipped.
+
+    Pages through the files and directories that TASK_ID skipped because of
+    errors (see "transfer --skip-source-errors") and submits new transfer tasks
+    containing only those items, with the same endpoints and options as the
+    original task. Records are streamed and submitted in tasks of at most
+    --chunk-size items, so tasks with millions of files can be retried without
+    holding them all in memory. The new task_ids are printed to stdout.
+
+    If --wait is passed, this command will also wait for all of the new tasks
+    to finish (see "globus wait --help").
+    """
+    tc = get_transfer_client_or_exit(settings[constants.AUTH].get(constants.REFRESH_TOKEN))
+
+    try:
+        task = tc.get_task(task_id)
+    except globus_sdk.TransferAPIError as e:
+        logger.exception(f"Could not get task {task_id}")
+        error(f"Could not get task {task_id}: {e.message}", exit_code=constants.RETRY_ERROR)
+
+    if task["status"] in constants.TASK_RUNNING_STATUSES:
+        error(f"Task {task_id} is still {task['status']}", exit_code=constants.RETRY_ERROR)
+
+    if label is None:
+        # the original's guard and fingerprint tags would make the retry look like the original
+        label = remove_label_tags(task.get("label"), constants.RETRY_DROPPED_TAG_PREFIXES)
+        label = add_label_tag(label, "retry", constants.LABEL_MAX_LENGTH)
+
+    activate_endpoints_or_exit(tc, [task["source_endpoint_id"], task["destination_endpoint_id"]])
+
+    task_ids = []
+    num_items = 0
+
+    def submit(tdata):
+        result = tc.submit_transfer(tdata)
+        task_ids.append(result["task_id"])
+        logger.debug(f"Submitted retry task {result['task_id']} with {len(tdata['DATA'])} items")
+
+    tdata = transfer_data_like(tc, task, label=label)
+    for record in iter_skipped_errors(tc, task_id):
+        tdata.add_item(
+            record["source_path"],
+            record["destination_path"],
+            recursive=bool(record.get("is_directory")),
+        )
+        num_items += 1
+
+        if len(tdata["DATA"]) >= chunk_size:
+            submit(tdata)
+            tdata = transfer_data_like(tc, task, label=label)
+
+    if len(tdata["DATA"]) > 0:
+        submit(tdata)
+
+    if num_items == 0:
+        warning(f"Task {task_id} has no skipped files to retry")
+        return
+
+    logger.info(f"Retrying {num_items} items from task {task_id} in {len(task_ids)} tasks")
+
+    if wait:
+        wait_for_tasks_or_exit(
+            transfer_client=tc,
+            task_ids=task_ids,
+            timeout=timeout,
+            interval=interval,
+            max_attempts=attempts,
+        )
+
+    click.secho("\n".join(task_ids))
+
+
+@cli.command()
+@click.argument("task_ids", nargs=-1, required=True)
+@click.pass_obj
+def cancel(settings, task_ids):
+    """
+    Cancel one or more tasks.
+
+    Multiple tasks are cancelled concurrently.
+    """
+    tc = get_transfer_client_or_exit(settings[constants.AUTH].get(constants.REFRESH_TOKEN))
+
+    results = aio.run_with(tc, aio.cancel_tasks, task_ids)
+
+    failed = False
+    for task_id, result in results.items():
+        if isinstance(result, globus_sdk.TransferAPIError):
+            logger.error(f"Task {task_id} was not successfully cancelled: {result}")
+            click.secho(
+                f"Error: Task {task_id} was not successfully cancelled: {result.message}",
+                err=True,
+                fg="red",
+            )
+            failed = True
+        elif isinstance(result, Exception):
+            raise result
+        elif result["code"] == "Canceled":
+            click.secho(f"Task {task_id} has been successfully cancelled", fg="green")
+        else:
+            logger.error(f"Task {task_id} was not successfully cancelled:\n{result}")
+            click.secho(
+                f"Error: Task {task_id} was not successfully cancelled:\n{result}",
+                err=True,
+                fg="red",
+            )
+            failed = True
+
+    if failed:
+        sys.exit(constants.CANCEL_TASK_ERROR)
+
+
+@cli.command()
+@endpoint_arg("endpoint")
+@click.argument("paths", nargs=-1)
+@click.option(
+    "--from-file",
+    "from_files",
+    type=click.File("r"),
+    multiple=True,
+    help="Read additional paths from this file (or - for stdin), one per line. Lines in the format produced by find -printf '%y %s %p\\n' are also accepted. May be passed multiple times.",
+)
+@click.option("--label", help="A label for the delete tasks.")
+@click.option("--recursive", "-r", is_flag=True, help="Delete directories and their contents.")
+@click.option(
+    "--ignore-missing", is_flag=True, help="Do not fail the task if a path does not exist.",
+)
+@click.option(
+    "--chunk-size",
+    type=click.IntRange(min=1),
+    default=constants.DELETE_CHUNK_SIZE,
+    help=f"How many paths to put in each delete task. Defaults to {constants.DELETE_CHUNK_SIZE}.",
+)
+@click.option(
+    "--dry",
+    is_flag=True,
+    help="Only report how many files, directories, and bytes would be deleted; do not delete anything.",
+)
+@click.option(
+    "--wait", is_flag=True, help="If passed, wait for all of the delete tasks to complete."
+)
+@wait_args
+@click.pass_obj
+def rm(
+    settings,
+    endpoint,
+    paths,
+    from_files,
+    label,
+    recursive,
+    ignore_missing,
+    chunk_size,
+    dry,
+    wait,
+    timeout,
+    interval,
+    attempts,
+):
+    """
+    Delete files and directories on an endpoint.
+
+    Paths can be given as arguments, read from files with --from-file, or both.
+    The paths are split into delete tasks of at most --chunk-size paths each,
+    which are submitted concurrently. The resulting task_ids are printed to stdout.
+
+    Directories are only deleted if --recursive is passed.
+
+    If --wait is passed, this command will also wait for all of the tasks to finish
+    (see the wait command for the semantics of this mode and descriptions
+    of the accompanying options; run "globus wait --help").
+    """
+    known = {}
+    for f in from_files:
+        known.update(read_path_listing(f))
+    paths = list(dict.fromkeys(list(paths) + list(known.keys())))
+
+    if len(paths) == 0:
+        error("No paths given to delete", exit_code=constants.DELETE_ERROR)
+
+    chunks = [paths[idx : idx + chunk_size] for idx in range(0, len(paths), chunk_size)]
+
+    tc = get_transfer_client_or_exit(settings[constants.AUTH].get(constants.REFRESH_TOKEN))
+
+    activate_endpoints_or_exit(tc, [endpoint])
+
+    if dry:
+        report_delete_plan(tc, endpoint, paths, known, recursive, len(chunks))
+        return
+
+    delete_datas = []
+    for chunk in chunks:
+        ddata = globus_sdk.DeleteData(
+            tc, endpoint, label=label, recursive=recursive, ignore_missing=ignore_missing
+        )
+        for path in chunk:
+            ddata.add_item(path)
+        delete_datas.append(ddata)
+
+    results = aio.run_with(tc, aio.submit_all, delete_datas, method="submit_delete")
+
+    task_ids = []
+    for ddata, result in zip(delete_datas, results):
+        if isinstance(result, Exception):
+            logger.error(f"Failed to submit delete task: {result}")
+            warning(f"Failed to submit delete task for {len(ddata['DATA'])} paths: {result}")
+            continue
+        task_ids.append(result["task_id"])
+
+    if wait and task_ids:
+        wait_for_tasks_or_exit(
+            transfer_client=tc,
+            task_ids=task_ids,
+            timeout=timeout,
+            interval=interval,
+            max_attempts=attempts,
+        )
+
+    click.secho("\n".join(task_ids))
+
+    if len(task_ids) != len(delete_datas):
+        sys.exit(constants.DELETE_ERROR)
+
+
+def read_path_listing(file):
+    """
+    Read paths from a file, one per line. Lines may also be in the format
+    produced by find -printf '%y %s %p\\n', in which case the type and size
+    of each path are remembered so that they do not need to be looked up.
+    """
+    entries = {}
+    for line in file:
+        line = line.rstrip("\n")
+        if not line.strip():
+            continue
+
+        match = re.match(constants.FIND_LISTING_LINE, line)
+        if match is not None:
+            is_dir = match.group("type") == "d"
+            entries[match.group("path")] = {
+                "files": 0 if is_dir else 1,
+                "dirs": 1 if is_dir else 0,
+                "size": 0 if is_dir else int(match.group("size")),
+            }
+        else:
+            entries[line.strip()] = None
+
+    return entries
+
+
+def report_delete_plan(transfer_client, endpoint, paths, known, recursive, num_tasks):
+    unknown = [p for p in paths if known.get(p) is None or (recursive and known[p]["dirs"])]
+    measured = dict(known)
+    if unknown:
+        measured.update(
+            aio.run_with(transfer_client, aio.measure_paths, endpoint, unknown, recursive=recursive)
+        )
+
+    missing = [p for p in paths if measured.get(p) is None]
+    files = sum(measured[p]["files"] for p in paths if measured.get(p) is not None)
+    dirs = sum(measured[p]["dirs"] for p in paths if measured.get(p) is not None)
+    size = sum(measured[p]["size"] for p in paths if measured.get(p) is not None)
+
+    click.secho(
+        f"Would delete {len(paths)} paths ({files} files, {dirs} directories, {humanize.naturalsize(size)}) in {num_tasks} tasks"
+    )
+    if missing:
+        warning(f"{len(missing)} paths do not exist: {' '.join(missing[:10])}")
+
+
+@cli.command()
+@click.argument("task_ids", nargs=-1, required=True)
+@wait_args
+@click.pass_obj
+def wait(settings, task_ids, timeout, interval, attempts):
+    """
+    Wait for one or more tasks to complete.
+
+    Multiple tasks are waited on concurrently; the timeout applies to each
+    task separately. The task ids are printed once all of them have completed.
+    """
+    tc = get_transfer_client_or_exit(settings[constants.AUTH].get(constants.REFRESH_TOKEN))
+
+    wait_for_tasks_or_exit(
+        transfer_client=tc,
+        task_ids=task_ids,
+        timeout=timeout,
+        interval=interval,
+        max_attempts=attempts,
+    )
+
+    click.secho("\n".join(task_ids))
+
+
+@cli.command()
+@click.option("--raw", is_flag=True, help="Print raw job ads instead of the pretty display.")
+@click.option(
+    "--follow",
+    "-f",
+    is_flag=True,
+    help="Keep the display up to date by following the jobs' event logs, until interrupted.",
+)
+@click.option(
+    "--interval",
+    type=float,
+    default=2,
+    help="How often to check the event logs for updates in --follow mode, in seconds. Defaults to 2 seconds.",
+)
+@click.pass_obj
+def status(settings, raw, follow, interval):
+    """
     Get information on Globus transfer HTCondor jobs.
+
+    With --follow, the schedd is only queried at startup and when new Globus
+    jobs are submitted; otherwise the display is updated from the events
+    written to each job's event log, which is much cheaper than repeatedly
+    running this command (e.g., with watch).
     """
+    jobs = {job.cluster_id: job for job in get_globus_jobs()}
 
+    if not follow:
+        click.echo(format_jobs(jobs.values(), raw=raw), nl=False)
+        return
+
+    follower = JobLogFollower(jobs.values())
+    changed = True
+    while True:
+        if changed:
+            click.clear()
+            click.echo(format_jobs(jobs.values(), raw=raw), nl=False)
+            changed = False
+
+        time.sleep(interval)
+
+        new_clusters = False
+        for event in follower.events():
+            job = jobs.get(event.cluster)
+            if job is None:
+                logger.debug(f"Saw event for unknown cluster {event.cluster}")
+                new_clusters = True
+                continue
+            changed |= job.apply_event(event)
+
+        if new_clusters or follower.new_logs_appeared():
+            logger.debug("New Globus jobs found, re-querying the schedd")
+            jobs = {job.cluster_id: job for job in get_globus_jobs()}
+            follower.track(jobs.values())
+            changed = True
+
+
+@cli.command()
+@click.argument("cluster_ids", nargs=-1, type=int)
+@click.option("--held", is_flag=True, help="Show the logs of every held Globus job.")
+@click.option(
+    "--stream",
+    "streams",
+    type=click.Choice(constants.LOGS_STREAMS, case_sensitive=False),
+    multiple=True,
+    help="Which files to show: the job's output, error, or event log. May be passed multiple times. Defaults to output and error.",
+)
+@click.option(
+    "--lines",
+    "-n",
+    type=int,
+    default=constants.LOGS_LINES,
+    help=f"How many lines to show from the end of each file. Defaults to {constants.LOGS_LINES}.",
+)
+@click.option("--errors", is_flag=True, help="Only show lines that look like errors (see --grep).")
+@click.option(
+    "--grep",
+    "pattern",
+    default=None,
+    callback=lambda ctx, param, value: validate_pattern(value),
+    help=f"Only show lines matching this (case-insensitive) regular expression. With --errors, defaults to '{constants.LOGS_ERROR_PATTERN}'.",
+)
+@click.option(
+    "--follow",
+    "-f",
+    is_flag=True,
+    help="Keep printing lines as they are written, until interrupted.",
+)
+@click.option(
+    "--interval",
+    type=float,
+    default=1,
+    help="How often to check the files for new lines in --follow mode, in seconds. Defaults to 1 second.",
+)
+def logs(cluster_ids, held, streams, lines, errors, pattern, follow, interval):
+    """
+    Show the output of Globus transfer HTCondor jobs.
+
+    Shows the end of the output and error files of the jobs with the given
+    CLUSTER_IDS and/or (with --held) of every held Globus job. Files are read
+    backwards from their end, so this is fast even on very large files. With
+    --follow, lines are printed as they are written to any of the files, each
+    prefixed with the job and file it came from.
+    """
+    if not cluster_ids and not held:
+        error("Pass at least one cluster ID, or --held")
+
+    jobs = [
+        job for job in get_globus_jobs() if job.cluster_id in cluster_ids or (held and job.is_held)
+    ]
+    missing = set(cluster_ids) - {job.cluster_id for job in jobs}
+    for cluster_id in sorted(missing):
+        warning(f"No Globus job with cluster ID {cluster_id}")
+    if not jobs:
+        return
+
+    if errors and pattern is None:
+        pattern = constants.LOGS_ERROR_PATTERN
+    predicate = re.compile(pattern, re.IGNORECASE).search if pattern is not None else None
+
+    files = [
+        (f"{job.cluster_id}.{job.proc_id} {stream}", path)
+        for job in sorted(jobs, key=lambda j: (j.cluster_id, j.proc_id))
+        for stream, path in job_files(job, streams or ["out", "err"])
+    ]
+
+    followers = []
+    for name, path in files:
+        try:
+            tail, offset = tail_lines(path, lines, predicate=predicate)
+        except FileNotFoundError:
+            logger.debug(f"{path} does not exist (yet)")
+            tail, offset = [], 0
+
+        click.secho(f"==> {name}: {path} <==", bold=True)
+        for line in tail:
+            click.echo(line)
+        followers.append((name, FileFollower(path, offset)))
+
+    if not follow:
+        return
+
+    while True:
+        time.sleep(interval)
+        for name, follower in followers:
+            for line in follower.lines():
+                if predicate is None or predicate(line):
+                    click.echo(f"{click.style(name, bold=True)} | {line}")
+
+
+def validate_pattern(pattern):
+    if pattern is None:
+        return None
+    try:
+        re.compile(pattern)
+    except re.error as e:
+        raise click.BadParameter(f"not a valid regular expression: {e}")
+    return pattern
+
+
+def job_files(job, streams):
+    paths = {"out": lambda: job.stdout, "err": lambda: job.stderr, "log": lambda: job.log}
+    for stream in streams:
+        try:
+            yield stream, paths[stream]()
+        except KeyError:
+            logger.debug(f"Job {job.cluster_id} has no {stream} file")
+
+
+@cli.command()
+@click.option("--pool", help="The collector to find schedds with. Defaults to the local pool.")
+@click.option(
+    "--by",
+    type=click.Choice(["user", "schedd"], case_sensitive=False),
+    default="user",
+    help="Whether to summarize jobs per user or per schedd. Defaults to user.",
+)
+@click.option(
+    "--timeout",
+    type=float,
+    default=constants.POOL_QUERY_TIMEOUT,
+    help=f"How many seconds to wait for the schedds to answer. Defaults to {constants.POOL_QUERY_TIMEOUT} seconds.",
+)
+@output_options(constants.POOL_STATUS_HEADERS)
+def pool_status(pool, by, timeout, output_format, columns):
+    """
+    Summarize Globus jobs across every schedd and user in the pool.
+
+    Finds every schedd through the collector and queries them all at once,
+    so this takes about as long as the slowest schedd takes to answer.
+    Schedds that fail or do not answer within --timeout are reported on stderr.
+    """
+    ads_by_schedd, failed = query_pool(
+        "IsGlobusJob", constants.POOL_QUERY_PROJECTION, timeout=timeout, pool=pool
+    )
+
+    if by == "user":
+        rows = summarize_by_user(ads_by_schedd)
+    else:
+        rows = summarize_by_schedd(ads_by_schedd)
+
+    if columns is not None:
+        columns = [by] + [c for c in columns if c != by]
+
+    emit(rows, output_format, columns, alignment=constants.POOL_STATUS_COLUMN_ALIGNMENTS)
+
+    for name, reason in sorted(failed.items()):
+        warning(f"Could not query schedd {name}: {reason}")
+
+
+def format_jobs(jobs, raw=False):
     now = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc)
-    for idx, job in enumerate(sorted(get_globus_jobs(), key=lambda j: j.cluster_id)):
+    blocks = []
+    for job in sorted(jobs, key=lambda j: j.cluster_id):
         if raw:
-            click.echo(str(job))
+            blocks.append(str(job) + "\n")
             continue
 
         status_msg = click.style(
@@ -695,6 +2132,7 @@ def status(settings, raw):
         lines.extend(
             [
                 f"Hold Reason: {job.hold_reason}" if job.is_held else None,
+                format_progress(job.transfer_progress, now),
                 f"Cluster ID: {job.cluster_id}",
                 f"Universe: {job.universe}",
                 f"Cron: {click.style('✔', fg = 'green') if job.is_cron else click.style('❌', fg = 'red')}",
@@ -713,17 +2151,313 @@ def status(settings, raw):
             rows.append("├─ " + line)
         rows.append("└─ " + lines[-1])
         rows.append("")
-        click.echo("\n".join(rows))
+        blocks.append("\n".join(rows) + "\n")
+
+    return "".join(blocks)
+
+
+def format_progress(progress, now):
+    if progress is None:
+        return None
+
+    files = f"{progress['files_done']}/{progress['files']} files"
+    size = humanize.naturalsize(progress["bytes_transferred"])
+    rate = humanize.naturalsize(progress["rate"])
+    tasks = ", ".join(progress["task_ids"])
+    msg = f"Transfer: {progress['status']}, {files}, {size} at {rate}/s (tasks {tasks}"
+    if progress["updated_at"] is not None:
+        msg += f", updated {humanize.naturaldelta(now - progress['updated_at'])} ago"
+    return msg + ")"
 
 
 @cli.command()
+@click.option(
+    "--window",
+    type=float,
+    default=constants.RENEW_WINDOW_HOURS,
+    help=f"Renew activations that expire within this many hours. Defaults to {constants.RENEW_WINDOW_HOURS} hours.",
+)
+@click.option(
+    "--flag-jobs/--no-flag-jobs",
+    default=True,
+    help="Whether to mark the jobs that use endpoints needing manual activation, so that 'globus release' prompts for them. Defaults to flagging.",
+)
+@click.pass_context
+def renew_activations(context, window, flag_jobs):
+    """
+    Renew endpoint activations before queued Globus jobs need them.
+
+    Finds every endpoint used by your queued Globus jobs and autoactivates the
+    ones whose activation expires within --window hours. Endpoints that can
+    not be autoactivated are reported (and the jobs that use them flagged,
+    like a failed activation inside a job would) so that they can be
+    activated manually, with 'globus activate' or 'globus release', before
+    the jobs fail.
+
+    This is meant to run periodically; for example, submit it as an HTCondor
+    cron job with "globus --as-submit-description renew-activations" and add
+    cron_minute = 0 and cron_hour = */6 to the description.
+    The exit code is 2 if any endpoint needs manual activation, and 1 if any
+    endpoint could not be looked up or renewed (the others are still renewed).
+    """
+    settings = context.obj
+    jobs = [j for j in get_globus_jobs() if j.status in ("IDLE", "RUNNING", "HELD")]
+
+    jobs_by_endpoint = {}
+    for job in jobs:
+        for endpoint in endpoints_for_job(context, job):
+            jobs_by_endpoint.setdefault(endpoint, []).append(job)
+
+    if not jobs_by_endpoint:
+        logger.info("No endpoints are used by queued Globus jobs")
+        return
+
+    tc = get_transfer_client_or_exit(settings[constants.AUTH].get(constants.REFRESH_TOKEN))
+
+    window_seconds = int(window * 60 * 60)
+    endpoints = list(jobs_by_endpoint.keys())
+    infos = aio.run_with(tc, aio.get_endpoints, endpoints)
+    responses = aio.run_with(tc, aio.autoactivate, endpoints, if_expires_in=window_seconds)
+
+    rows = []
+    manual = []
+    errors = {}
+    for endpoint in endpoints:
+        info = infos[endpoint]
+        response = responses[endpoint]
+        if isinstance(info, Exception) or isinstance(response, Exception):
+            errors[endpoint] = info if isinstance(info, Exception) else response
+            action = f"error: {errors[endpoint]}"
+        elif response["code"] == "AutoActivationFailed":
+            action = "needs manual activation"
+            manual.append(endpoint)
+        elif response["code"].startswith("AlreadyActivated"):
+            action = "ok"
+        else:
+            action = "renewed"
+
+        row = {
+            "endpoint": endpoint,
+            "display_name": "",
+            "expires_in": "unknown",
+            "jobs": len(jobs_by_endpoint[endpoint]),
+            "action": action,
+        }
+        if not isinstance(info, Exception):
+            info = EndpointInfo(info)
+            row["display_name"] = info["display_name"]
+            row["expires_in"] = (
+                humanize.naturaldelta(info.activation_expires_in)
+                if info["expires_in"] >= 0
+                else "never"
+            )
+        rows.append(row)
+
+    click.secho(
+        table(
+            headers=constants.RENEW_HEADERS,
+            rows=rows,
+            alignment=constants.RENEW_COLUMN_ALIGNMENTS,
+            header_fmt=constants.BOLD_HEADER,
+            style=lambda row: {"fg": "green" if row["action"] in ("ok", "renewed") else "red"},
+        )
+    )
+
+    for endpoint, e in errors.items():
+        logger.error(f"Could not renew the activation of endpoint {endpoint}: {e}")
+        warning(f"Could not renew the activation of endpoint {endpoint}: {e}")
+
+    if not manual:
+        if errors:
+            sys.exit(constants.ENDPOINT_INFO_ERROR)
+        return
+
+    if flag_jobs:
+        # these are other jobs, so edit them through the schedd whatever their universe,
+        # and key the flags by endpoint so they never clobber the ones a job set itself
+        schedd = htcondor.Schedd()
+        for endpoint in manual:
+            attr_safe_endpoint = re.sub(r"[^A-Za-z0-9]", "_", endpoint)
+            key = f"{constants.ENDPOINT_ACTIVATION_REQUIRED}_{attr_safe_endpoint}"
+            for job in jobs_by_endpoint[endpoint]:
+                constraint = f"ClusterId == {job.cluster_id} && ProcId == {job.proc_id}"
+                schedd.edit(constraint, key, classad.quote(endpoint))
+
+    for endpoint in manual:
+        query = urlencode({"origin_id": endpoint})
+        warning(
+            f"Endpoint {endpoint} requires manual activation: https://app.globus.org/file-manager?{query}"
+        )
+
+    sys.exit(constants.NEEDS_USER_INPUT)
+
+
+def endpoints_in_command(context, args):
+    """
+    Find the endpoint arguments (resolved through bookmarks) of a globus
+    command line, given without the leading "globus".
+    """
+    root = context.find_root()
+    args = [a for a in args if a != constants.AS_JOB]
+    while args and args[0].startswith("-"):
+        args = args[1:]
+
+    try:
+        name, command, rest = cli.resolve_command(root, args)
+        if command is None or isinstance(command, click.MultiCommand):
+            return []
+        sub_context = command.make_context(name, rest, parent=root, resilient_parsing=True)
+    except (click.ClickException, click.exceptions.Exit):
+        return []
+
+    endpoints = []
+    for param in command.params:
+        value = sub_context.params.get(param.name)
+        if not value:
+            continue
+        if param.name.endswith("_endpoints"):
+            endpoints.extend(value)
+        elif param.name.endswith("endpoint"):
+            endpoints.append(value)
+
+    return list(dict.fromkeys(endpoints))
+
+
+def endpoints_for_job(context, job):
+    recorded = job.get("GlobusEndpoints")
+    if isinstance(recorded, str) and recorded:
+        return recorded.split(",")
+
+    args = job.get("Arguments") or job.get("Args") or ""
+    return endpoints_in_command(context, shlex.split(args))
+
+
+@cli.command()
+@click.argument("logs", nargs=-1, type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--per-job", is_flag=True, help="Also print a row for every job, not just the aggregates.",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="How many processes to read logs with. Defaults to the number of CPUs.",
+)
+def analyze(logs, per_job, workers):
+    """
+    Summarize how transfer jobs spent their time, from their event logs.
+
+    Reads the given HTCondor event logs (by default, every globus_job_*.log
+    file in the current directory, as written by jobs submitted from
+    --as-submit-description) and reports, per job and in aggregate,
+    how long jobs waited in the queue before first starting, how long they
+    spent idle, running, and held, and how often they were held.
+    Jobs that are still idle, running, or held are counted up to now.
+    """
+    if not logs:
+        logs = sorted(Path.cwd().glob(constants.JOB_LOG_GLOB))
+    if not logs:
+        error(f"No event logs found matching {constants.JOB_LOG_GLOB}")
+
+    summaries = analyze_logs(logs, workers=workers)
+    logger.debug(f"Analyzed {len(summaries)} jobs from {len(logs)} event logs")
+
+    if per_job:
+        click.secho(
+            table(
+                headers=constants.ANALYZE_PER_JOB_HEADERS,
+                rows=[format_durations(s) for s in summaries],
+                alignment=constants.ANALYZE_COLUMN_ALIGNMENTS,
+                header_fmt=constants.BOLD_HEADER,
+            )
+        )
+        click.echo()
+
+    rows = aggregate(summaries)
+    for row in rows:
+        if row["metric"] == "ever_held":
+            row["mean"] = f"{row['mean']:.1%}" if row["mean"] is not None else None
+        elif row["metric"] != "holds":
+            row.update(format_durations({k: row[k] for k in ("mean", "median", "max")}))
+        elif row["mean"] is not None:
+            row["mean"] = f"{row['mean']:.2f}"
+
+    click.secho(
+        table(
+            headers=["metric", "jobs", "mean", "median", "max"],
+            rows=[{k: v for k, v in row.items() if v is not None} for row in rows],
+            alignment=constants.ANALYZE_COLUMN_ALIGNMENTS,
+            header_fmt=constants.BOLD_HEADER,
+        )
+    )
+
+
+def format_durations(row):
+    return {
+        k: humanize.naturaldelta(datetime.timedelta(seconds=v))
+        if k in constants.ANALYZE_DURATION_KEYS and v is not None
+        else v
+        for k, v in row.items()
+    }
+
+
+@cli.command()
+@click.option(
+    "--auto",
+    is_flag=True,
+    default=False,
+    help="Instead of interactively resolving every hold, only release jobs whose holds look transient, following the release policy.",
+)
+@click.option(
+    "--max-releases",
+    type=int,
+    default=constants.RELEASE_MAX_RELEASES,
+    help=f"With --auto, leave jobs held after they have been released this many times. Defaults to {constants.RELEASE_MAX_RELEASES}.",
+)
+@click.option(
+    "--backoff",
+    type=float,
+    default=constants.RELEASE_BACKOFF_BASE,
+    help=f"With --auto, how long (in seconds) a job must stay held before its first release; doubled after every release. Defaults to {constants.RELEASE_BACKOFF_BASE} seconds.",
+)
+@click.option(
+    "--max-backoff",
+    type=float,
+    default=constants.RELEASE_BACKOFF_MAX,
+    help=f"With --auto, the longest (in seconds) a job is left held before being released again. Defaults to {constants.RELEASE_BACKOFF_MAX} seconds.",
+)
+@click.option(
+    "--dry",
+    is_flag=True,
+    default=False,
+    help="With --auto, show what would be released, but do not release anything.",
+)
 @click.pass_obj
-def release(settings):
+def release(settings, auto, max_releases, backoff, max_backoff, dry):
     """
     Interactively resolve holds on Globus transfer HTCondor jobs.
+
+    With --auto, holds are instead resolved by policy, without any
+    interaction. Each held job's hold is classified from its hold reason and
+    exit code: jobs that failed because the Globus services were unreachable
+    or overloaded are released, waiting exponentially longer (starting at
+    --backoff seconds) after each release, up to --max-releases times. Jobs
+    held by you, jobs that need an endpoint activated, and jobs that failed
+    for any other reason are left held. The number of releases is recorded
+    in each job's GlobusReleaseCount attribute.
+
+    The policy is meant to run unattended; for example, submit it as an
+    HTCondor cron job with "globus --as-submit-description release --auto"
+    and add cron_minute = */10 to the description.
     """
     schedd = htcondor.Schedd()
     jobs = get_globus_jobs()
+
+    if auto:
+        held = [job for job in jobs if job.is_held]
+        auto_release(schedd, held, max_releases, backoff, max_backoff, dry)
+        return
+
     for ad_idx, job in enumerate(jobs):
         click.echo(f"Attempting to resolve holds for job {job.cluster_id}")
 
@@ -743,6 +2477,45 @@ def release(settings):
         schedd.act(htcondor.JobAction.Release, f"ClusterId == {job.cluster_id}")
 
 
+def auto_release(schedd, jobs, max_releases, backoff, max_backoff, dry):
+    now = time.time()
+    rows = []
+    for job in jobs:
+        hold_class, action, detail = policy.decide(job, max_releases, backoff, max_backoff, now=now)
+        logger.info(f"Held job {job.cluster_id}.{job.proc_id} ({hold_class}): {action}, {detail}")
+
+        if action == policy.RELEASE and not dry:
+            try:
+                policy.release_job(schedd, job, now=now)
+            except (OSError, RuntimeError) as e:
+                logger.exception(f"Failed to release job {job.cluster_id}.{job.proc_id}")
+                action, detail = policy.KEEP, f"release failed: {e}"
+
+        rows.append(
+            {
+                "job": f"{job.cluster_id}.{job.proc_id}",
+                "class": hold_class,
+                "releases": policy.release_count(job),
+                "action": action,
+                "detail": detail,
+            }
+        )
+
+    if not rows:
+        logger.info("No held Globus jobs")
+        return
+
+    click.secho(
+        table(
+            headers=constants.RELEASE_HEADERS,
+            rows=rows,
+            alignment=constants.RELEASE_COLUMN_ALIGNMENTS,
+            header_fmt=constants.BOLD_HEADER,
+            style=lambda row: {"fg": constants.RELEASE_ACTION_TO_COLOR[row["action"]]},
+        )
+    )
+
+
 # CLI HELPERS
 
 
@@ -771,16 +2544,11 @@ def get_transfer_client_or_exit(refresh_token):
             exit_code=constants.AUTHORIZATION_ERROR,
         )
 
-    client = get_client()
-    authorizer = globus_sdk.RefreshTokenAuthorizer(refresh_token, client)
-    return globus_sdk.TransferClient(authorizer=authorizer)
+    return clients.get_transfer_client(refresh_token)
 
 
 def activate_endpoints_or_exit(transfer_client, endpoints):
-    unactivated_endpoints = [
-        e for e in endpoints if not EndpointInfo.get_or_exit(transfer_client, e).is_active
-    ]
-    unactivated_endpoints = activate_endpoints_automatically(transfer_client, unactivated_endpoints)
+    unactivated_endpoints = aio.run_with(transfer_client, aio.activate_endpoints, endpoints)
     unactivated_endpoints = activate_endpoints_manually(transfer_client, unactivated_endpoints)
 
     if len(unactivated_endpoints) > 0:
@@ -788,24 +2556,16 @@ def activate_endpoints_or_exit(transfer_client, endpoints):
         logger.error(msg)
         error(msg, exit_code=constants.ENDPOINT_ACTIVATION_ERROR)
 
-    for endpoint in endpoints:
-        expires_in = EndpointInfo.get_or_exit(transfer_client, endpoint).activation_expires_in
+    for endpoint, response in aio.run_with(transfer_client, aio.get_endpoints, endpoints).items():
+        if isinstance(response, Exception):
+            logger.debug(f"Could not get the activation of endpoint {endpoint}: {response}")
+            continue
+        expires_in = EndpointInfo(response).activation_expires_in
         logger.info(f"Activation of endpoint {endpoint} will expire in {expires_in}")
 
     return True
 
 
-def activate_endpoints_automatically(transfer_client, endpoints):
-    unactivated = []
-    for endpoint in endpoints:
-        response = transfer_client.endpoint_autoactivate(endpoint)
-
-        if response["code"] == "AutoActivationFailed":
-            unactivated.append(endpoint)
-
-    return unactivated
-
-
 def activate_endpoints_manually(transfer_client, endpoints):
     unactivated = []
     for idx, endpoint in enumerate(endpoints):
@@ -834,31 +2594,71 @@ def activate_endpoints_manually(transfer_client, endpoints):
 
 
 def wait_for_task_or_exit(transfer_client, task_id, timeout, interval=10, max_attempts=1):
+    return wait_for_tasks_or_exit(
+        transfer_client, [task_id], timeout, interval=interval, max_attempts=max_attempts
+    )
+
+
+def wait_for_tasks_or_exit(transfer_client, task_ids, timeout, interval=10, max_attempts=1):
+    remaining, errored = wait_for_tasks_with_attempts(
+        transfer_client, task_ids, timeout, interval=interval, max_attempts=max_attempts
+    )
+
+    if remaining:
+        msg = f"Timed out waiting for tasks {' '.join(remaining)} after {max_attempts} attempts."
+        logger.error(msg)
+        error(msg, exit_code=wait_exit_code(errored))
+
+    return True
+
+
+def wait_for_tasks_with_attempts(transfer_client, task_ids, timeout, interval=10, max_attempts=1):
+    """
+    Wait for tasks, trying up to ``max_attempts`` times.
+    Returns the ids of the tasks that never finished, and whether waiting
+    for any of them raised an error.
+    """
+    job_ad = current_job_ad()
+    on_update = ProgressPublisher(job_ad).update if job_ad is not None else None
+
+    remaining = list(task_ids)
     attempts = 0
-    done = False
     errored = False
     while True:
         attempts += 1
-        logger.debug(f"Attempting to wait for task {task_id} [attempt {attempts}/{max_attempts}]")
-        try:
-            done = transfer_client.task_wait(task_id, timeout=timeout, polling_interval=interval)
-        except globus_sdk.TransferAPIError as e:
-            logger.exception(f"Could not wait for task {task_id}.")
-            warning(f"Could not wait for task {task_id} due to error: {e.message}")
-            errored = True
+        logger.debug(
+            f"Attempting to wait for tasks {' '.join(remaining)} [attempt {attempts}/{max_attempts}]"
+        )
 
-        if done:
-            return done
+        results = aio.run_with(
+            transfer_client,
+            aio.wait_for_tasks,
+            remaining,
+            timeout=timeout,
+            interval=interval,
+            on_update=on_update,
+        )
+
+        for task_id, result in results.items():
+            if isinstance(result, globus_sdk.TransferAPIError):
+                logger.error(f"Could not wait for task {task_id}: {result}")
+                warning(f"Could not wait for task {task_id} due to error: {result.message}")
+                errored = True
+            elif isinstance(result, Exception):
+                raise result
 
-        logger.debug(f"Attempt {attempts} to wait for task {task_id} failed")
+        remaining = [t for t, result in results.items() if not isinstance(result, str)]
+        if not remaining:
+            return [], errored
+
+        logger.debug(f"Attempt {attempts} to wait for tasks {' '.join(remaining)} failed")
 
         if attempts >= max_attempts:
-            msg = f"Timed out waiting for task {task_id} after {attempts} attempts."
-            logger.error(msg)
-            error(
-                msg,
-                exit_code=constants.WAIT_TASK_TIMEOUT if not errored else constants.WAIT_TASK_ERROR,
-            )
+            return remaining, errored
+
+
+def wait_exit_code(errored):
+    return constants.WAIT_TASK_ERROR if errored else constants.WAIT_TASK_TIMEOUT
 
 
 def warning(msg):
@@ -874,7 +2674,7 @@ def error(msg, exit_code=1):
 
 
 def get_client():
-    return globus_sdk.NativeAppAuthClient(constants.CLIENT_ID)
+    return clients.get_auth_client()
 
 
 def acquire_refresh_token():
@@ -0,0 +1,208 @@
+import email.utils
+import logging
+import random
+import threading
+import time
+
+import requests
+
+from . import constants
+from .utils import lazy_import
+
+globus_sdk = lazy_import("globus_sdk")
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket rate limiter.
+
+    Tokens are replenished continuously at ``rate`` per second, up to
+    ``capacity``. ``acquire`` blocks until enough tokens are available.
+    A ``rate`` of ``None`` (or zero) disables rate limiting entirely.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        if not self.rate:
+            return
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+
+                delay = (tokens - self._tokens) / self.rate
+
+            time.sleep(delay)
+
+
+class RetryingSession(requests.Session):
+    """
+    A :class:`requests.Session` that waits on a shared :class:`TokenBucket`
+    before every request and retries rate-limited (429) and server error (5xx)
+    responses, as well as connection errors and timeouts.
+
+    Retries honor the ``Retry-After`` header when the server sends one,
+    and otherwise use exponential backoff with full jitter.
+    """
+
+    def __init__(self, rate_limiter, max_retries, backoff_base, backoff_max):
+        super().__init__()
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def request(self, method, url, *args, **kwargs):
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire()
+
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self.backoff(attempt)
+                logger.debug(f"{method} {url} raised {e!r}, retrying in {delay:.2f}s")
+            else:
+                if (
+                    response.status_code not in constants.HTTP_RETRY_STATUS_CODES
+                    or attempt >= self.max_retries
+                ):
+                    return response
+
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                delay = (
+                    min(retry_after, self.backoff_max)
+                    if retry_after is not None
+                    else self.backoff(attempt)
+                )
+                logger.debug(
+                    f"{method} {url} returned {response.status_code}, retrying in {delay:.2f}s"
+                )
+                response.close()
+
+            attempt += 1
+            time.sleep(delay)
+
+    def backoff(self, attempt):
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+
+def parse_retry_after(value):
+    """
+    Parse a ``Retry-After`` header value (either delta-seconds or an HTTP date)
+    into a number of seconds to wait, or ``None`` if it is absent or malformed.
+    """
+    if value is None:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    return max(0.0, when.timestamp() - time.time())
+
+
+_lock = threading.RLock()
+_session = None
+_auth_client = None
+_transfer_clients = {}
+
+
+def get_session():
+    """
+    Get the process-wide HTTP session, which pools keep-alive connections
+    and shares one rate limiter between every client and thread.
+    """
+    global _session
+
+    with _lock:
+        if _session is None:
+            rate_limiter = TokenBucket(
+                rate=constants.HTTP_RATE_LIMIT, capacity=constants.HTTP_RATE_LIMIT_BURST
+            )
+            _session = RetryingSession(
+                rate_limiter=rate_limiter,
+                max_retries=constants.HTTP_MAX_RETRIES,
+                backoff_base=constants.HTTP_BACKOFF_BASE,
+                backoff_max=constants.HTTP_BACKOFF_MAX,
+            )
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=constants.HTTP_POOL_CONNECTIONS,
+                pool_maxsize=constants.HTTP_POOL_SIZE,
+            )
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+            logger.debug(
+                f"Created shared HTTP session (pool size {constants.HTTP_POOL_SIZE}, rate limit {constants.HTTP_RATE_LIMIT}/s)"
+            )
+
+        return _session
+
+
+def use_session(client, session):
+    """
+    Make a globus_sdk client send its requests through ``session``.
+
+    globus_sdk 1.x has no public way to give a client a session; each client
+    keeps its own :class:`requests.Session` in ``_session``. This is the only
+    place that relies on that, and it fails loudly if the SDK stops doing so.
+    """
+    if not isinstance(getattr(client, "_session", None), requests.Session):
+        raise RuntimeError(
+            f"{type(client).__name__} does not keep a requests session in _session; the installed globus_sdk is not supported"
+        )
+
+    client._session = session
+    return client
+
+
+def get_auth_client():
+    global _auth_client
+
+    with _lock:
+        if _auth_client is None:
+            _auth_client = use_session(
+                globus_sdk.NativeAppAuthClient(constants.CLIENT_ID), get_session()
+            )
+
+        return _auth_client
+
+
+def get_transfer_client(refresh_token):
+    """
+    Get a :class:`globus_sdk.TransferClient` for the given refresh token.
+
+    Clients are cached per refresh token and share the pooled, rate-limited
+    session from :func:`get_session`, so repeated calls are cheap.
+    """
+    with _lock:
+        if refresh_token not in _transfer_clients:
+            authorizer = globus_sdk.RefreshTokenAuthorizer(refresh_token, get_auth_client())
+            _transfer_clients[refresh_token] = use_session(
+                globus_sdk.TransferClient(authorizer=authorizer), get_session()
+            )
+
+        return _transfer_clients[refresh_token]
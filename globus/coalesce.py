@@ -0,0 +1,174 @@
+"""
+Coalesce per-file transfer specifications into recursive directory items.
+
+A source directory can be replaced by a single recursive item when every
+entry in it is covered: each file by a file specification mapping it to the
+same name in one destination directory, and each subdirectory by a directory
+that was itself coalesced into the matching destination subdirectory.
+Directories are considered deepest first, so whole subtrees collapse into
+one item where possible.
+"""
+
+import logging
+import posixpath
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+
+class _Group:
+    def __init__(self, dst_dir):
+        self.dst_dir = dst_dir
+        self.files = {}  # name -> original spec
+        self.subdirs = set()
+
+
+def _depth(path):
+    return path.rstrip("/").count("/")
+
+
+def _common_ancestor(paths):
+    parts = [p.rstrip("/").split("/") for p in paths]
+    common = []
+    for level in zip(*parts):
+        if len(set(level)) != 1:
+            break
+        common.append(level[0])
+    return "/".join(common)
+
+
+def _subdir_covered(groups, complete, directory, name):
+    """
+    A subdirectory is covered if it was coalesced and its files go to the
+    same-named subdirectory of its parent's destination.
+    """
+    subdir = posixpath.join(directory, name)
+    return (
+        name in groups[directory].subdirs
+        and subdir in complete
+        and groups[subdir].dst_dir == posixpath.join(groups[directory].dst_dir, name)
+    )
+
+
+def coalesce_specs(specs, lister):
+    """
+    Replace sets of file specifications that cover whole source directories
+    with recursive directory specifications.
+
+    ``lister`` takes a list of source directory paths and returns a dictionary
+    mapping each to a list of ``(name, is_dir)`` pairs, or to ``None`` if the
+    directory could not be listed (in which case it is left alone).
+
+    Returns the new list of specifications and a report dictionary.
+    """
+    groups = {}
+    others = []
+    for spec in specs:
+        src, dst = spec.split(":")
+        src_dir, src_name = posixpath.split(src)
+        dst_dir, dst_name = posixpath.split(dst)
+        if src.endswith("/") or dst.endswith("/") or src_name != dst_name or not src_dir:
+            others.append(spec)
+            continue
+
+        group = groups.setdefault(src_dir, _Group(dst_dir))
+        if group.dst_dir != dst_dir:
+            # files from one source directory go to several destinations; leave them be
+            others.append(spec)
+            continue
+        group.files[src_name] = spec
+
+    if not groups:
+        return list(specs), {"before": len(specs), "after": len(specs), "directories": 0}
+
+    stop_at = _common_ancestor(list(groups.keys()))
+    complete = set()
+    pending = set(groups.keys())
+    listed = 0
+
+    while pending:
+        depth = max(_depth(d) for d in pending)
+        level = sorted(d for d in pending if _depth(d) == depth)
+        pending.difference_update(level)
+
+        listings = lister(level)
+        listed += len(level)
+
+        for directory in level:
+            listing = listings.get(directory)
+            group = groups[directory]
+            if listing is None:
+                continue
+
+            covered = all(
+                _subdir_covered(groups, complete, directory, name)
+                if is_dir
+                else name in group.files
+                for name, is_dir in listing
+            )
+            if not covered:
+                continue
+
+            complete.add(directory)
+
+            parent, name = posixpath.split(directory)
+            dst_parent, dst_name = posixpath.split(group.dst_dir)
+            if (
+                len(directory) <= len(stop_at)
+                or not parent
+                or dst_name != name
+                or (parent in groups and groups[parent].dst_dir != dst_parent)
+            ):
+                continue
+
+            parent_group = groups.setdefault(parent, _Group(dst_parent))
+            parent_group.subdirs.add(name)
+            pending.add(parent)
+
+    # only keep the outermost complete directories
+    roots = {d for d in complete if posixpath.dirname(d) not in complete}
+
+    def inside_root(directory):
+        while directory and directory not in roots:
+            parent = posixpath.dirname(directory)
+            if parent == directory:
+                return False
+            directory = parent
+        return bool(directory)
+
+    new_specs = list(others)
+    for directory, group in groups.items():
+        if directory in roots:
+            new_specs.append(f"{directory}/:{group.dst_dir}/")
+        elif not inside_root(directory):
+            new_specs.extend(group.files.values())
+
+    report = {
+        "before": len(specs),
+        "after": len(new_specs),
+        "directories": len(roots),
+        "listed": listed,
+    }
+    logger.debug(f"Coalesced transfer specifications: {report}")
+    return new_specs, report
+
+
+def manifest_lister(entries, root):
+    """
+    Make a lister for :func:`coalesce_specs` from the entries of a recursive
+    manifest taken at ``root`` (whose names are relative to ``root``).
+    """
+    root = root.rstrip("/")
+    directories = {root: []}
+    for entry in entries:
+        path = posixpath.join(root, entry["name"])
+        parent, name = posixpath.split(path)
+        is_dir = entry["type"] == "dir"
+        directories.setdefault(parent, []).append((name, is_dir))
+        if is_dir:
+            directories.setdefault(path, [])
+
+    def lister(paths):
+        return {p: directories.get(p) for p in paths}
+
+    return lister
@@ -0,0 +1,159 @@
+"""
+Shell completion callbacks for endpoint arguments and remote paths.
+
+Completions are served from small on-disk caches, so they return quickly.
+On a cache miss for a remote directory listing, the listing is fetched on a
+background thread, and completion gives up (returning nothing) if it takes
+longer than a tight timeout, so a slow or unreachable endpoint never hangs
+the shell.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import posixpath
+import threading
+import time
+
+from . import constants
+from .settings import load_settings
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+
+def _read_json(path, ttl=None):
+    try:
+        doc = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+    if ttl is not None and time.time() - doc.get("fetched_at", 0) > ttl:
+        return None
+
+    return doc
+
+
+def _write_json(path, doc):
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(doc))
+        os.replace(str(tmp), str(path))
+    except OSError as e:
+        logger.debug(f"Could not write completion cache {path}: {e}")
+
+
+def remember_endpoints(endpoints):
+    """
+    Record endpoint ids and display names for completion, passing the
+    endpoints through unchanged (so it can wrap a streaming iterator).
+    """
+    known = (_read_json(constants.COMPLETION_ENDPOINTS_PATH) or {}).get("endpoints", {})
+    for endpoint in endpoints:
+        known[endpoint["id"]] = endpoint.get("display_name") or ""
+        yield endpoint
+    _write_json(
+        constants.COMPLETION_ENDPOINTS_PATH, {"fetched_at": time.time(), "endpoints": known}
+    )
+
+
+def complete_endpoint(ctx, args, incomplete):
+    """Complete an endpoint argument from bookmarks and previously-seen endpoints."""
+    candidates = {}
+    known = (_read_json(constants.COMPLETION_ENDPOINTS_PATH) or {}).get("endpoints", {})
+    candidates.update(known)
+
+    for bookmark, endpoint in load_settings()[constants.BOOKMARKS].items():
+        candidates[bookmark] = f"bookmark for {known.get(endpoint) or endpoint}"
+
+    return sorted((c, h) for c, h in candidates.items() if c.startswith(incomplete))
+
+
+def _resolve_endpoint(endpoint):
+    if endpoint is None:
+        return None
+    return load_settings()[constants.BOOKMARKS].get(endpoint, endpoint)
+
+
+def _listing_cache_path(endpoint, directory):
+    key = hashlib.sha1(f"{endpoint}\0{directory}".encode()).hexdigest()
+    return constants.COMPLETION_LISTINGS_DIR / f"{key}.json"
+
+
+def _fetch_listing(endpoint, directory):
+    from .clients import get_transfer_client
+
+    refresh_token = load_settings()[constants.AUTH].get(constants.REFRESH_TOKEN)
+    if refresh_token is None:
+        return None
+
+    tc = get_transfer_client(refresh_token)
+    entries = [[e["name"], e["type"] == "dir"] for e in tc.operation_ls(endpoint, path=directory)]
+    _write_json(
+        _listing_cache_path(endpoint, directory), {"fetched_at": time.time(), "entries": entries}
+    )
+    return entries
+
+
+def list_remote_directory(endpoint, directory, timeout=constants.COMPLETION_TIMEOUT):
+    """
+    List a remote directory as ``[name, is_dir]`` pairs, from the cache if it
+    is fresh enough, or else from the Transfer API if that answers within
+    ``timeout`` seconds. Returns an empty list if neither works.
+    """
+    doc = _read_json(_listing_cache_path(endpoint, directory), ttl=constants.COMPLETION_CACHE_TTL)
+    if doc is not None:
+        return doc["entries"]
+
+    result = []
+
+    def fetch():
+        try:
+            result.extend(_fetch_listing(endpoint, directory) or [])
+        except Exception as e:
+            logger.debug(f"Could not list {directory} on {endpoint} for completion: {e}")
+
+    thread = threading.Thread(target=fetch, daemon=True)
+    thread.start()
+    thread.join(timeout)
+
+    return list(result) if not thread.is_alive() else []
+
+
+def _complete_path(endpoint, incomplete, prefix=""):
+    if endpoint is None:
+        return []
+
+    head, partial = posixpath.split(incomplete)
+    if head:
+        directory = shown = head if head.endswith("/") else head + "/"
+    else:
+        # relative paths are relative to the home directory on the endpoint
+        directory, shown = "~/", ""
+
+    return [
+        prefix + shown + name + ("/" if is_dir else "")
+        for name, is_dir in list_remote_directory(endpoint, directory)
+        if name.startswith(partial)
+    ]
+
+
+def complete_path(ctx, args, incomplete):
+    """Complete a --path option against the command's endpoint argument."""
+    return _complete_path(_resolve_endpoint(ctx.params.get("endpoint")), incomplete)
+
+
+def complete_transfer_spec(ctx, args, incomplete):
+    """
+    Complete a SRC:DST transfer specification: the part before the colon
+    against the source endpoint, and the part after it against the destination.
+    """
+    if ":" not in incomplete:
+        return _complete_path(_resolve_endpoint(ctx.params.get("source_endpoint")), incomplete)
+
+    src, dst = incomplete.split(":", 1)
+    return _complete_path(
+        _resolve_endpoint(ctx.params.get("destination_endpoint")), dst, prefix=f"{src}:"
+    )
@@ -6,6 +6,95 @@ import click
 # GLOBUS
 CLIENT_ID = "fbb557b2-aa0b-42e9-9a07-04c5c4f01474"
 
+# HTTP
+HTTP_POOL_CONNECTIONS = 4
+HTTP_POOL_SIZE = 32
+HTTP_MAX_RETRIES = 6
+HTTP_BACKOFF_BASE = 0.5
+HTTP_BACKOFF_MAX = 60
+HTTP_RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+HTTP_RATE_LIMIT = 10  # requests per second, per process
+HTTP_RATE_LIMIT_BURST = 20
+
+# ASYNC
+ASYNC_CONCURRENCY = 16
+LS_BATCH_SIZE = 256  # directories listed at once when streaming a recursive listing
+# as in TransferClient.task_wait, a task is done waiting for once it is not ACTIVE;
+# INACTIVE tasks are paused or need credentials, and will not finish on their own
+TASK_ACTIVE_STATUS = "ACTIVE"
+TASK_RUNNING_STATUSES = ("ACTIVE", "INACTIVE")
+RECORDS_PAGE_SIZE = 1000
+RETRY_CHUNK_SIZE = 10_000
+
+# GUARD
+GUARD_POLICIES = ["ignore", "skip", "wait", "coalesce"]
+GUARD_KEY_LENGTH = 16
+GUARD_TAG_PREFIX = "guard-"
+GUARD_TASK_ID_ATTR = "GlobusGuardTaskId"
+LABEL_MAX_LENGTH = 128
+
+# IDEMPOTENCY
+FINGERPRINT_LENGTH = 24
+FINGERPRINT_TAG_PREFIX = "fp-"
+FINGERPRINT_OPTIONS = ["sync_level", "preserve_timestamp", "verify_checksum"]
+IDEMPOTENCY_WINDOW = 24 * 60 * 60  # seconds
+IDEMPOTENCY_SEARCH_LIMIT = 1000  # tasks
+IDEMPOTENT_MATCH_STATUSES = ("ACTIVE", "INACTIVE", "SUCCEEDED")
+
+# RETRY
+RETRY_DROPPED_TAG_PREFIXES = [GUARD_TAG_PREFIX, FINGERPRINT_TAG_PREFIX]
+
+# DELETE
+DELETE_CHUNK_SIZE = 10_000
+FIND_LISTING_LINE = r"^(?P<type>[a-z]) (?P<size>\d+) (?P<path>.+)$"
+
+# BENCH
+BENCH_DEFAULT_SIZES = "1M,64M,1G"
+BENCH_DEFAULT_COUNTS = "1,10,100"
+BENCH_TIMEOUT = 2 * 60 * 60  # seconds, per test transfer
+
+# LOCAL TRANSFERS
+LOCAL_COPY_WORKERS = 8
+LOCAL_COPY_CHUNK_SIZE = 64 * 1024 * 1024
+LOCAL_CHECKSUM_BLOCK_SIZE = 1024 * 1024
+TRANSFER_BACKENDS = ["globus", "local", "auto"]
+
+# PROGRESS
+PROGRESS_MIN_INTERVAL = 60  # seconds
+PROGRESS_TASK_IDS_ATTR = "GlobusTaskIds"
+PROGRESS_STATUS_ATTR = "GlobusTaskStatus"
+PROGRESS_BYTES_ATTR = "GlobusBytesTransferred"
+PROGRESS_FILES_DONE_ATTR = "GlobusFilesDone"
+PROGRESS_FILES_ATTR = "GlobusFiles"
+PROGRESS_RATE_ATTR = "GlobusTransferRate"
+PROGRESS_UPDATED_ATTR = "GlobusProgressUpdated"
+
+# LOGS
+LOGS_LINES = 20
+LOGS_BLOCK_SIZE = 64 * 1024
+LOGS_MAX_SCAN_BYTES = 64 * 1024 * 1024
+LOGS_ERROR_PATTERN = r"error|exception|traceback|failed|fatal|denied|refused"
+LOGS_STREAMS = ["out", "err", "log"]
+
+# RELEASE
+RELEASE_MAX_RELEASES = 5
+RELEASE_BACKOFF_BASE = 300  # seconds
+RELEASE_BACKOFF_MAX = 6 * 60 * 60  # seconds
+RELEASE_COUNT_ATTR = "GlobusReleaseCount"
+LAST_RELEASE_ATTR = "GlobusLastReleaseTime"
+USER_HOLD_REASON_CODE = 1
+TRANSIENT_HOLD_PATTERNS = [
+    r"timed? ?out",
+    r"connection (refused|reset|aborted)",
+    r"temporar(y|ily)",
+    r"service unavailable",
+    r"too many requests",
+    r"\bHTTP(/[\d.]+)? (429|5\d\d)\b",
+]
+
+# RENEW
+RENEW_WINDOW_HOURS = 24
+
 # UPDATE
 GIT_REPO_URL = "https://github.com/JoshKarpel/globus-transfer"
 
@@ -13,8 +102,21 @@ GIT_REPO_URL = "https://github.com/JoshKarpel/globus-transfer"
 SETTINGS_FILE_DEFAULT_PATH = Path.home() / ".globus_transfer_settings"
 AUTH = "auth"
 BOOKMARKS = "bookmarks"
+LOCAL_ROOTS = "local_roots"
 REFRESH_TOKEN = "refresh_token"
 
+# CACHES
+CACHE_DIR = Path.home() / ".globus_transfer_cache"
+SCAN_INDEX_DIR = CACHE_DIR / "scan"
+SCAN_WORKERS = 16
+GUARD_STATE_DIR = CACHE_DIR / "guard"
+FINGERPRINT_INDEX_PATH = CACHE_DIR / "fingerprints.json"
+BENCH_RESULTS_DIR = CACHE_DIR / "bench"
+COMPLETION_ENDPOINTS_PATH = CACHE_DIR / "completion" / "endpoints.json"
+COMPLETION_LISTINGS_DIR = CACHE_DIR / "completion" / "listings"
+COMPLETION_CACHE_TTL = 60  # seconds
+COMPLETION_TIMEOUT = 0.5  # seconds
+
 # CLI
 AS_JOB = "--as-submit-description"
 CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
@@ -25,13 +127,26 @@ ENDPOINT_ACTIVATION_ERROR = 1
 ENDPOINT_INFO_ERROR = 1
 INVALID_TRANSFER_SPECIFICATION_ERROR = 1
 CANCEL_TASK_ERROR = 1
+DELETE_ERROR = 1
+RETRY_ERROR = 1
+BENCH_ERROR = 1
 WAIT_TASK_ERROR = 1
 WAIT_TASK_TIMEOUT = 5
 UPGRADE_ERROR = 1
+BATCH_ERROR = 1
+FANOUT_ERROR = 1
+LOCAL_TRANSFER_ERROR = 1
 NEEDS_USER_INPUT = 2
+TRANSIENT_ERROR = 3
 
 # FORMATTING
 BOLD_HEADER = functools.partial(click.style, bold=True)
+OUTPUT_FORMATS = ["table", "json", "ndjson", "csv"]
+ALL_COLUMNS = "all"
+DEFAULT_BOOKMARKS_HEADERS = ["bookmark", "endpoint"]
+BATCH_COLUMN_ALIGNMENTS = {"command": "ljust"}
+DEFAULT_LOCAL_ROOTS_HEADERS = ["endpoint", "root"]
+LOCAL_ROOTS_LS_COLUMN_ALIGNMENTS = {"endpoint": "ljust", "root": "ljust"}
 BOOKMARKS_LS_COLUMN_ALIGNMENTS = {"endpoint": "ljust", "bookmark": "ljust"}
 DEFAULT_ENDPOINTS_HEADERS = ["id", "display_name"]
 ENDPOINTS_COLUMN_ALIGNMENTS = {"id": "ljust", "display_name": "ljust"}
@@ -44,9 +159,47 @@ DEFAULT_HISTORY_HEADERS = [
     "completion_time",
 ]
 HISTORY_COLUMN_ALIGNMENTS = {"task_id": "ljust", "label": "ljust"}
+DEFAULT_FANOUT_HEADERS = [
+    "destination",
+    "task_id",
+    "status",
+    "files_transferred",
+    "bytes_transferred",
+]
+FANOUT_COLUMN_ALIGNMENTS = {"destination": "ljust", "task_id": "ljust"}
 DEFAULT_LS_HEADERS = ["DATA_TYPE", "name", "size"]
 LS_COLUMN_ALIGNMENTS = {"DATA_TYPE": "ljust", "name": "ljust"}
 ENDPOINT_ACTIVATION_REQUIRED = "GlobusEndpointActivationRequired"
+BENCH_HEADERS = ["size", "count", "total", "status", "duration", "throughput"]
+BENCH_COLUMN_ALIGNMENTS = {"size": "rjust", "count": "rjust", "total": "rjust"}
+ANALYZE_PER_JOB_HEADERS = [
+    "job",
+    "state",
+    "queue_wait",
+    "idle_time",
+    "run_time",
+    "runs",
+    "holds",
+    "held_time",
+    "mean_time_to_release",
+]
+ANALYZE_DURATION_KEYS = {
+    "queue_wait",
+    "idle_time",
+    "run_time",
+    "held_time",
+    "mean_time_to_release",
+    "mean",
+    "median",
+    "max",
+}
+ANALYZE_COLUMN_ALIGNMENTS = {"job": "ljust", "metric": "ljust"}
+POOL_STATUS_COLUMN_ALIGNMENTS = {"user": "ljust", "schedd": "ljust"}
+RELEASE_HEADERS = ["job", "class", "releases", "action", "detail"]
+RELEASE_COLUMN_ALIGNMENTS = {"job": "ljust", "class": "ljust", "action": "ljust", "detail": "ljust"}
+RELEASE_ACTION_TO_COLOR = {"release": "green", "wait": "yellow", "keep": "red"}
+RENEW_HEADERS = ["endpoint", "display_name", "expires_in", "jobs", "action"]
+RENEW_COLUMN_ALIGNMENTS = {"endpoint": "ljust", "display_name": "ljust", "action": "ljust"}
 JOB_STATUS_TO_COLOR = {"IDLE": "yellow", "RUNNING": "green", "HELD": "red"}
 
 # HTCONDOR
@@ -54,3 +207,7 @@ VANILLA_UNIVERSE = 5
 LOCAL_UNIVERSE = 12
 UNIVERSE = {5: "VANILLA", 12: "LOCAL"}
 JOB_STATUS = {1: "IDLE", 2: "RUNNING", 3: "REMOVED", 4: "COMPLETED", 5: "HELD"}
+JOB_LOG_GLOB = "globus_job_*.log"
+POOL_QUERY_PROJECTION = ["Owner", "JobStatus", "ClusterId", "ProcId", "IsTransferJob"]
+POOL_QUERY_TIMEOUT = 20  # seconds
+POOL_STATUS_HEADERS = ["IDLE", "RUNNING", "HELD", "COMPLETED", "REMOVED", "TOTAL"]
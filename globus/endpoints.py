@@ -1,7 +1,10 @@
 import datetime
 import logging
 
-import globus_sdk
+from .utils import lazy_import
+
+globus_sdk = lazy_import("globus_sdk")
+
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
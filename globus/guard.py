@@ -0,0 +1,100 @@
+import hashlib
+import json
+import logging
+import time
+
+from . import constants
+from .jobs import get_scratch_ad, set_job_attr
+from .utils import label_has_tag, lazy_import
+
+classad = lazy_import("classad")
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+
+def guard_key(source_endpoint, destination_endpoint, transfers, job_ad=None):
+    """
+    Identify a recurring transfer. Inside a job, the key is derived from the
+    job's cluster id, so every run of a cron job shares it; otherwise it is
+    derived from the endpoints and transfer specifications.
+    """
+    if job_ad is not None:
+        raw = f"job:{job_ad.get('GlobalJobId', job_ad['ClusterId'])}"
+    else:
+        raw = "\0".join([source_endpoint, destination_endpoint, *sorted(transfers)])
+    return hashlib.sha1(raw.encode()).hexdigest()[: constants.GUARD_KEY_LENGTH]
+
+
+def guard_tag(key):
+    return f"{constants.GUARD_TAG_PREFIX}{key}"
+
+
+def _state_path(key):
+    return constants.GUARD_STATE_DIR / f"{key}.json"
+
+
+def recorded_task_ids(key, job_ad=None):
+    """Task ids recorded by previous runs, most trustworthy first."""
+    task_ids = []
+
+    if job_ad is not None:
+        task_id = job_ad.get(constants.GUARD_TASK_ID_ATTR)
+        if isinstance(task_id, str):
+            task_ids.append(task_id)
+
+    try:
+        task_ids.append(json.loads(_state_path(key).read_text())["task_id"])
+    except (OSError, ValueError, KeyError):
+        pass
+
+    return list(dict.fromkeys(task_ids))
+
+
+def find_running_task(transfer_client, key, job_ad=None):
+    """
+    Find a still-running task from a previous run with this guard key.
+
+    The task ids recorded in the job ad and on local disk are checked first.
+    If neither is available (or they are stale), the user's active tasks are
+    searched for one whose label carries this key's tag, so that the guard
+    still works if the local state was lost.
+    """
+    for task_id in recorded_task_ids(key, job_ad):
+        task = transfer_client.get_task(task_id)
+        if task["status"] in constants.TASK_RUNNING_STATUSES:
+            logger.debug(f"Recorded task {task_id} for guard {key} is still {task['status']}")
+            return task_id
+        logger.debug(f"Recorded task {task_id} for guard {key} is {task['status']}")
+
+    tag = guard_tag(key)
+    for task in transfer_client.task_list(
+        num_results=None, filter=f"status:{','.join(constants.TASK_RUNNING_STATUSES)}"
+    ):
+        if label_has_tag(task["label"], tag):
+            logger.debug(f"Found running task {task['task_id']} tagged with guard {key}")
+            return task["task_id"]
+
+    return None
+
+
+def record_task(key, task_id, job_ad=None):
+    path = _state_path(key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"task_id": task_id, "submitted_at": time.time()}))
+
+    if job_ad is not None:
+        try:
+            set_job_attr(constants.GUARD_TASK_ID_ATTR, classad.quote(task_id), scratch_ad=job_ad)
+        except Exception:
+            logger.exception(f"Could not record task {task_id} in the job ad")
+
+    logger.debug(f"Recorded task {task_id} for guard {key}")
+
+
+def current_job_ad():
+    try:
+        return get_scratch_ad()
+    except (OSError, SyntaxError, ValueError):
+        logger.exception("Could not read the job ad")
+        return None
@@ -0,0 +1,105 @@
+import datetime
+import hashlib
+import json
+import logging
+import os
+import time
+
+from . import constants
+from .utils import label_has_tag
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+
+def fingerprint(transfer_data):
+    """
+    A stable fingerprint of a transfer: its endpoints, items, and options,
+    independent of item order and of the label and submission id.
+    """
+    doc = {
+        "source_endpoint": transfer_data["source_endpoint"],
+        "destination_endpoint": transfer_data["destination_endpoint"],
+        "items": sorted(
+            (item["source_path"], item["destination_path"], bool(item.get("recursive")))
+            for item in transfer_data["DATA"]
+        ),
+        "options": {k: transfer_data.get(k) for k in constants.FINGERPRINT_OPTIONS},
+    }
+    raw = json.dumps(doc, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()[: constants.FINGERPRINT_LENGTH]
+
+
+def fingerprint_tag(fp):
+    return f"{constants.FINGERPRINT_TAG_PREFIX}{fp}"
+
+
+class FingerprintIndex:
+    """
+    A small on-disk record of recently submitted fingerprints and their task ids.
+    Entries older than ``window`` seconds are forgotten.
+    """
+
+    def __init__(self, path=None, window=constants.IDEMPOTENCY_WINDOW):
+        self.path = path or constants.FINGERPRINT_INDEX_PATH
+        self.window = window
+
+    def _load(self):
+        try:
+            entries = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+        cutoff = time.time() - self.window
+        return {fp: e for fp, e in entries.items() if e["submitted_at"] >= cutoff}
+
+    def get(self, fp):
+        entry = self._load().get(fp)
+        return entry["task_id"] if entry is not None else None
+
+    def add(self, fp, task_id):
+        entries = self._load()
+        entries[fp] = {"task_id": task_id, "submitted_at": time.time()}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(entries))
+        os.replace(str(tmp), str(self.path))
+
+
+def find_duplicate_task(transfer_client, fp, index):
+    """
+    Find a task for the same fingerprint that is still running or that
+    succeeded within the index's window.
+
+    The local index is checked first (one API call to confirm the task's
+    status); if it has no usable entry, up to IDEMPOTENCY_SEARCH_LIMIT of the
+    user's tasks requested within the window are searched for one whose label
+    carries the fingerprint tag.
+    """
+    task_id = index.get(fp)
+    if task_id is not None:
+        task = transfer_client.get_task(task_id)
+        if task["status"] in constants.IDEMPOTENT_MATCH_STATUSES:
+            logger.debug(f"Fingerprint {fp} matches indexed task {task_id} ({task['status']})")
+            return task_id
+        logger.debug(f"Indexed task {task_id} for fingerprint {fp} is {task['status']}")
+
+    since = datetime.datetime.utcnow() - datetime.timedelta(seconds=index.window)
+    task_filter = "/".join(
+        [
+            f"status:{','.join(constants.IDEMPOTENT_MATCH_STATUSES)}",
+            f"request_time:{since.strftime('%Y-%m-%dT%H:%M:%S')},",
+        ]
+    )
+    tag = fingerprint_tag(fp)
+    tasks = transfer_client.task_list(
+        num_results=constants.IDEMPOTENCY_SEARCH_LIMIT, filter=task_filter
+    )
+    for task in tasks:
+        if label_has_tag(task["label"], tag):
+            logger.debug(f"Fingerprint {fp} matches task {task['task_id']} ({task['status']})")
+            index.add(fp, task["task_id"])
+            return task["task_id"]
+
+    return None
@@ -1,15 +1,18 @@
 import datetime
+import functools
 import getpass
 import logging
 import os
+import threading
+import time
 from pathlib import Path
 
-import classad
-import htcondor
-from htchirp import HTChirp
-
 from . import constants
-from .utils import is_interactive
+from .utils import is_interactive, lazy_import
+
+classad = lazy_import("classad")
+htcondor = lazy_import("htcondor")
+htchirp = lazy_import("htchirp")
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
@@ -25,8 +28,82 @@ def get_globus_jobs(user=None):
     return [Job(ad) for ad in schedd.query(constraint)]
 
 
+def query_pool(constraint, projection, timeout, pool=None):
+    """
+    Query every schedd in the pool at once using the bindings' non-blocking
+    query interface, so the total latency is close to that of the slowest
+    schedd (or ``timeout`` seconds, whichever is shorter).
+
+    Returns ``(ads_by_schedd, failed)``, where ``failed`` maps the names of
+    schedds that could not be queried or did not answer in time to a reason.
+    """
+    collector = htcondor.Collector(pool) if pool is not None else htcondor.Collector()
+    schedd_ads = collector.locateAll(htcondor.DaemonTypes.Schedd)
+    logger.debug(f"Found {len(schedd_ads)} schedds in the pool")
+
+    queries = []
+    ads_by_schedd = {}
+    failed = {}
+    for schedd_ad in schedd_ads:
+        name = schedd_ad["Name"]
+        try:
+            queries.append(htcondor.Schedd(schedd_ad).xquery(constraint, projection, name=name))
+            ads_by_schedd[name] = []
+        except (OSError, RuntimeError) as e:
+            logger.debug(f"Could not query schedd {name}: {e}")
+            failed[name] = str(e)
+
+    deadline = time.monotonic() + timeout
+    for query in htcondor.poll(queries, timeout_ms=int(timeout * 1000)):
+        try:
+            ads_by_schedd[query.tag()].extend(query.nextAdsNonBlocking())
+        except (OSError, RuntimeError) as e:
+            logger.debug(f"Query of schedd {query.tag()} failed: {e}")
+            failed[query.tag()] = str(e)
+        if time.monotonic() > deadline:
+            break
+
+    for query in queries:
+        if not query.done() and query.tag() not in failed:
+            failed[query.tag()] = f"timed out after {timeout} seconds"
+
+    for name in failed:
+        ads_by_schedd.pop(name, None)
+
+    return ads_by_schedd, failed
+
+
+def summarize_by_user(ads_by_schedd):
+    """Count jobs per user and status, across every schedd."""
+    counts = {}
+    for ads in ads_by_schedd.values():
+        for ad in ads:
+            row = counts.setdefault(
+                ad.get("Owner", "unknown"), dict.fromkeys(constants.JOB_STATUS.values(), 0)
+            )
+            status = constants.JOB_STATUS.get(ad.get("JobStatus"), "UNKNOWN")
+            row[status] = row.get(status, 0) + 1
+
+    return [
+        {"user": user, **row, "TOTAL": sum(row.values())} for user, row in sorted(counts.items())
+    ]
+
+
+def summarize_by_schedd(ads_by_schedd):
+    """Count jobs per schedd and status."""
+    rows = []
+    for name, ads in sorted(ads_by_schedd.items()):
+        row = {"schedd": name, **dict.fromkeys(constants.JOB_STATUS.values(), 0)}
+        for ad in ads:
+            status = constants.JOB_STATUS.get(ad.get("JobStatus"), "UNKNOWN")
+            row[status] = row.get(status, 0) + 1
+        row["TOTAL"] = len(ads)
+        rows.append(row)
+    return rows
+
+
 class Job:
-    def __init__(self, ad: classad.ClassAd):
+    def __init__(self, ad: "classad.ClassAd"):
         self._ad = ad
 
     def __getitem__(self, item):
@@ -84,6 +161,28 @@ class Job:
     def hold_reason(self):
         return self._ad["HoldReason"]
 
+    @property
+    def transfer_progress(self):
+        """
+        The transfer progress published by the job (see :class:`ProgressPublisher`),
+        or ``None`` if it has not published any.
+        """
+        if self._ad.get(constants.PROGRESS_TASK_IDS_ATTR) is None:
+            return None
+
+        updated = self._ad.get(constants.PROGRESS_UPDATED_ATTR)
+        return {
+            "task_ids": self._ad[constants.PROGRESS_TASK_IDS_ATTR].split(","),
+            "status": self._ad.get(constants.PROGRESS_STATUS_ATTR, ""),
+            "bytes_transferred": self._ad.get(constants.PROGRESS_BYTES_ATTR, 0),
+            "files_done": self._ad.get(constants.PROGRESS_FILES_DONE_ATTR, 0),
+            "files": self._ad.get(constants.PROGRESS_FILES_ATTR, 0),
+            "rate": self._ad.get(constants.PROGRESS_RATE_ATTR, 0),
+            "updated_at": datetime.datetime.fromtimestamp(updated).astimezone(datetime.timezone.utc)
+            if updated is not None
+            else None,
+        }
+
     @property
     def universe(self):
         return constants.UNIVERSE[self._ad["JobUniverse"]]
@@ -106,23 +205,172 @@ class Job:
     def log(self):
         return Path(self._ad["UserLog"]).absolute()
 
+    def apply_event(self, event):
+        """
+        Update this job's status from a job event, as the schedd would.
+        Returns whether the event changed anything.
+        """
+        status = event_type_to_status().get(event.type)
+        if status is None:
+            return False
+
+        if status == "COMPLETED" and self.is_cron:
+            status = "IDLE"
+
+        self._ad["JobStatus"] = JOB_STATUS_CODES[status]
+        self._ad["EnteredCurrentStatus"] = event.timestamp
+        if status == "HELD":
+            self._ad["HoldReason"] = event.get("HoldReason", "unknown")
+
+        return True
+
+
+class JobLogFollower:
+    """
+    Tails the user logs of a set of jobs with :class:`htcondor.JobEventLog`,
+    and notices when new Globus job logs appear in the same directories
+    (which means new clusters have been submitted).
+    """
+
+    def __init__(self, jobs):
+        self._logs = {}
+        self._dirs = set()
+        self._known_paths = set()
+        self.track(jobs)
+
+    def track(self, jobs):
+        for job in jobs:
+            path = job.log
+            self._dirs.add(path.parent)
+            if path in self._logs:
+                continue
+
+            try:
+                log = htcondor.JobEventLog(str(path))
+            except (OSError, RuntimeError) as e:
+                logger.debug(f"Could not open event log {path} for job {job.cluster_id}: {e}")
+                continue
+
+            # the schedd's view of the job is current, so skip the history
+            for _ in log.events(stop_after=0):
+                pass
+            self._logs[path] = log
+
+        self._known_paths = self._find_log_paths()
+
+    def _find_log_paths(self):
+        return {p.absolute() for d in self._dirs for p in d.glob(constants.JOB_LOG_GLOB)}
+
+    def events(self):
+        """Yield every event written to the tracked logs since the last call."""
+        for path, log in self._logs.items():
+            try:
+                yield from log.events(stop_after=0)
+            except (OSError, RuntimeError) as e:
+                logger.debug(f"Could not read event log {path}: {e}")
+
+    def new_logs_appeared(self):
+        return bool(self._find_log_paths() - self._known_paths)
+
+
+def get_scratch_ad():
+    """
+    Get the job ad of the job we are running inside of,
+    or ``None`` if we are not running inside a job.
+    """
+    scratch_dir = os.environ.get("_CONDOR_SCRATCH_DIR")
+    if scratch_dir is None:
+        return None
+
+    return classad.parseOne((Path(scratch_dir) / ".job.ad").read_text())
+
 
 def set_job_attr(key, value, scratch_ad=None):
     if scratch_ad is None:
         if is_interactive():
             raise ValueError("Setting a job attribute while not in a job requires a scratch ad.")
 
-        scratch_ad = classad.parseOne(
-            (Path(os.environ["_CONDOR_SCRATCH_DIR"]) / ".job.ad").read_text()
-        )
+        scratch_ad = get_scratch_ad()
 
     UNIVERSE_TO_SET_ATTR[scratch_ad["JobUniverse"]](scratch_ad, key, value)
 
     logger.debug(f"Set job attribute {key} = {value}")
 
 
+class ProgressPublisher:
+    """
+    Publishes the progress of the transfer tasks a job is waiting for into
+    the job's own ad, so that it can be seen with a schedd query instead of
+    a Globus API call per job. Updates are rate-limited to one every
+    ``min_interval`` seconds, except when a task stops being active.
+    """
+
+    def __init__(self, scratch_ad, min_interval=constants.PROGRESS_MIN_INTERVAL):
+        self.scratch_ad = scratch_ad
+        self.min_interval = min_interval
+        self._tasks = {}
+        self._published = {}
+        self._last_publish = None
+        self._lock = threading.Lock()
+
+    def update(self, task):
+        with self._lock:
+            self._tasks[task["task_id"]] = task
+
+            finished = task["status"] != constants.TASK_ACTIVE_STATUS
+            now = time.monotonic()
+            if (
+                not finished
+                and self._last_publish is not None
+                and now - self._last_publish < self.min_interval
+            ):
+                return
+
+            self._last_publish = now
+            self.publish()
+
+    def attributes(self):
+        tasks = list(self._tasks.values())
+        statuses = {t["status"] for t in tasks}
+        return {
+            constants.PROGRESS_TASK_IDS_ATTR: classad.quote(",".join(t["task_id"] for t in tasks)),
+            constants.PROGRESS_STATUS_ATTR: classad.quote(",".join(sorted(statuses))),
+            constants.PROGRESS_BYTES_ATTR: str(sum(t.get("bytes_transferred") or 0 for t in tasks)),
+            constants.PROGRESS_FILES_DONE_ATTR: str(
+                sum(
+                    (t.get("files_transferred") or 0) + (t.get("files_skipped") or 0) for t in tasks
+                )
+            ),
+            constants.PROGRESS_FILES_ATTR: str(sum(t.get("files") or 0 for t in tasks)),
+            # finished tasks report their average rate, which is no longer happening
+            constants.PROGRESS_RATE_ATTR: str(
+                sum(
+                    t.get("effective_bytes_per_second") or 0
+                    for t in tasks
+                    if t["status"] == constants.TASK_ACTIVE_STATUS
+                )
+            ),
+        }
+
+    def publish(self):
+        changed = {k: v for k, v in self.attributes().items() if self._published.get(k) != v}
+        if not changed:
+            return
+
+        changed[constants.PROGRESS_UPDATED_ATTR] = str(int(time.time()))
+        try:
+            for key, value in changed.items():
+                set_job_attr(key, value, scratch_ad=self.scratch_ad)
+        except Exception:
+            # progress is informational; never let it break the wait
+            logger.exception("Failed to publish transfer progress to the job ad")
+            return
+
+        self._published.update(changed)
+
+
 def _set_job_attr_vanilla_universe(scratch_job_ad, key, value):
-    with HTChirp() as chirp:
+    with htchirp.HTChirp() as chirp:
         chirp.set_job_attr(key, value)
 
 
@@ -133,6 +381,23 @@ def _set_job_attr_local_universe(scratch_job_ad, key, value):
     schedd.edit(constraint, key, value)
 
 
+JOB_STATUS_CODES = {v: k for k, v in constants.JOB_STATUS.items()}
+
+
+# built on first use, so that importing this module does not load htcondor
+@functools.lru_cache(maxsize=1)
+def event_type_to_status():
+    return {
+        htcondor.JobEventType.SUBMIT: "IDLE",
+        htcondor.JobEventType.EXECUTE: "RUNNING",
+        htcondor.JobEventType.JOB_EVICTED: "IDLE",
+        htcondor.JobEventType.JOB_HELD: "HELD",
+        htcondor.JobEventType.JOB_RELEASED: "IDLE",
+        htcondor.JobEventType.JOB_TERMINATED: "COMPLETED",
+        htcondor.JobEventType.JOB_ABORTED: "REMOVED",
+    }
+
+
 UNIVERSE_TO_SET_ATTR = {
     constants.VANILLA_UNIVERSE: _set_job_attr_vanilla_universe,
     constants.LOCAL_UNIVERSE: _set_job_attr_local_universe,
@@ -0,0 +1,101 @@
+import logging
+import os
+
+from . import constants
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+
+def _decode(line):
+    return line.decode("utf-8", errors="replace")
+
+
+def tail_lines(path, count, predicate=None, max_bytes=constants.LOGS_MAX_SCAN_BYTES):
+    """
+    Get the last ``count`` lines of a file (only counting lines that satisfy
+    ``predicate``, if it is given), by reading blocks backwards from the end
+    of the file, so the cost depends on how much has to be read rather than
+    on the size of the file. At most ``max_bytes`` are read.
+
+    Returns ``(lines, offset)``, where ``offset`` is the end of the last
+    finished line, for following the file afterwards. A last line that is
+    still being written is left out, so that it is followed in one piece.
+    """
+    with open(path, "rb") as f:
+        end = _last_line_end(f, f.seek(0, os.SEEK_END), max_bytes)
+        position = end
+        if end > 0:
+            f.seek(end - 1)
+            if f.read(1) == b"\n":
+                position -= 1
+        remainder = b""
+        lines = []
+        while position > 0 and len(lines) < count and end - position < max_bytes:
+            size = min(constants.LOGS_BLOCK_SIZE, position)
+            position -= size
+            f.seek(position)
+            block = f.read(size) + remainder
+
+            # the first piece may be the rest of a line that starts before this block
+            remainder, *complete = block.split(b"\n")
+            if position == 0:
+                complete.insert(0, remainder)
+                remainder = b""
+
+            for line in reversed(complete):
+                text = _decode(line).rstrip("\r")
+                if predicate is None or predicate(text):
+                    lines.append(text)
+                    if len(lines) == count:
+                        break
+
+    return list(reversed(lines)), end
+
+
+def _last_line_end(f, end, max_bytes):
+    """Find the offset just past the last newline before ``end``, reading at most ``max_bytes``."""
+    position = end
+    while position > 0 and end - position < max_bytes:
+        size = min(constants.LOGS_BLOCK_SIZE, position)
+        position -= size
+        f.seek(position)
+        newline = f.read(size).rfind(b"\n")
+        if newline >= 0:
+            return position + newline + 1
+    return position
+
+
+class FileFollower:
+    """
+    Yields the lines appended to a file since the last call to :meth:`lines`,
+    like ``tail -f``. A partially-written last line is held back until it is
+    finished, and a file that shrinks (e.g., is truncated or rotated) is
+    read again from the start.
+    """
+
+    def __init__(self, path, offset=0):
+        self.path = path
+        self.offset = offset
+        self._partial = b""
+
+    def lines(self):
+        try:
+            with open(self.path, "rb") as f:
+                size = f.seek(0, os.SEEK_END)
+                if size < self.offset:
+                    logger.debug(f"{self.path} shrank, reading it from the start")
+                    self.offset = 0
+                    self._partial = b""
+                if size == self.offset:
+                    return
+
+                f.seek(self.offset)
+                data = self._partial + f.read(size - self.offset)
+                self.offset = size
+        except FileNotFoundError:
+            return
+
+        *complete, self._partial = data.split(b"\n")
+        for line in complete:
+            yield _decode(line).rstrip("\r")
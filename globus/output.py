@@ -0,0 +1,98 @@
+import csv
+import json
+
+import click
+
+from . import constants
+from .formatting import table
+
+
+def output_options(default_columns):
+    """
+    Add the --format and --columns options shared by all list commands.
+    The decorated command receives ``output_format`` and ``columns``.
+    """
+
+    def parse_columns(ctx, param, value):
+        if value is None:
+            return list(default_columns)
+        if value == constants.ALL_COLUMNS:
+            return None
+        return [c.strip() for c in value.split(",") if c.strip()]
+
+    def _(func):
+        func = click.option(
+            "--columns",
+            default=None,
+            callback=parse_columns,
+            help=f"Comma-separated fields to show, or '{constants.ALL_COLUMNS}' for every field. Defaults to {','.join(default_columns)}.",
+        )(func)
+        func = click.option(
+            "--format",
+            "output_format",
+            type=click.Choice(constants.OUTPUT_FORMATS, case_sensitive=False),
+            default="table",
+            help="How to display the results. Everything but table is streamed as results arrive. Defaults to table.",
+        )(func)
+        return func
+
+    return _
+
+
+def project(rows, columns):
+    """
+    Lazily reduce each row to a plain dictionary of the selected columns
+    (or every field, if ``columns`` is ``None``).
+    """
+    for row in rows:
+        row = getattr(row, "data", row)
+        if columns is None:
+            yield dict(row)
+        else:
+            yield {c: row.get(c) for c in columns}
+
+
+def emit(rows, output_format, columns, alignment=None, style=None):
+    """
+    Print rows in the given format. The json, ndjson, and csv formats write
+    each row as soon as it is produced, so output starts immediately and memory
+    use stays constant no matter how many rows there are; table output needs
+    every row to size its columns.
+    """
+    rows = project(rows, columns)
+
+    if output_format == "table":
+        rows = list(rows)
+        headers = (
+            columns if columns is not None else list(dict.fromkeys(k for r in rows for k in r))
+        )
+        click.secho(
+            table(
+                headers=headers,
+                rows=[{k: v for k, v in r.items() if v is not None} for r in rows],
+                alignment=alignment,
+                header_fmt=constants.BOLD_HEADER,
+                style=style,
+            )
+        )
+    elif output_format == "ndjson":
+        for row in rows:
+            click.echo(json.dumps(row, default=str))
+    elif output_format == "json":
+        click.echo("[", nl=False)
+        for idx, row in enumerate(rows):
+            click.echo(("," if idx > 0 else "") + json.dumps(row, default=str), nl=False)
+        click.echo("]")
+    elif output_format == "csv":
+        writer = None
+        stdout = click.get_text_stream("stdout")
+        for row in rows:
+            if writer is None:
+                writer = csv.DictWriter(
+                    stdout, fieldnames=columns or list(row.keys()), extrasaction="ignore"
+                )
+                writer.writeheader()
+            writer.writerow(row)
+        stdout.flush()
+    else:
+        raise ValueError(f"Unknown output format {output_format}")
@@ -0,0 +1,144 @@
+import datetime
+import json
+import logging
+import re
+import time
+
+from . import constants
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+def parse_size(text):
+    """Parse a size like 4K, 100M, or 1.5G (binary units) into a number of bytes."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)i?B?\s*", text, flags=re.IGNORECASE)
+    if match is None:
+        raise ValueError(f"Invalid size: {text}")
+    number, unit = match.groups()
+    return int(float(number) * SIZE_UNITS[unit.upper()])
+
+
+def bench_file_name(size, idx):
+    return f"bench_{size}_{idx:06d}"
+
+
+def plan(sizes, counts):
+    """The matrix of (file size, file count) cells to run, smallest total first."""
+    return sorted(((size, count) for size in sizes for count in counts), key=lambda c: c[0] * c[1])
+
+
+def generate_files(directory, sizes, max_count):
+    """
+    Create the (sparse) test files for a benchmark under a local directory,
+    which should be shared by the source endpoint.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    for size in sizes:
+        for idx in range(max_count):
+            path = directory / bench_file_name(size, idx)
+            if path.exists() and path.stat().st_size == size:
+                continue
+            with path.open("wb") as f:
+                f.truncate(size)
+    logger.debug(f"Generated benchmark files in {directory}")
+
+
+def _parse_time(value):
+    return datetime.datetime.strptime(value[:19], "%Y-%m-%d %H:%M:%S").replace(
+        tzinfo=datetime.timezone.utc
+    )
+
+
+def measure_task(task):
+    """Extract the measurements of one benchmark cell from its finished task document."""
+    duration = (
+        _parse_time(task["completion_time"]) - _parse_time(task["request_time"])
+    ).total_seconds()
+    return {
+        "task_id": task["task_id"],
+        "status": task["status"],
+        "files": task.get("files_transferred", 0),
+        "bytes": task.get("bytes_transferred", 0),
+        "duration": duration,
+        "effective_bytes_per_second": task.get("effective_bytes_per_second"),
+    }
+
+
+def fit(cells):
+    """
+    Fit duration = task_overhead + files * per_file_overhead + bytes / throughput
+    to the measured cells by least squares. Returns ``None`` if there are not
+    enough distinct cells to fit.
+    """
+    rows = [(1.0, c["files"], c["bytes"]) for c in cells if c["status"] == "SUCCEEDED"]
+    ys = [c["duration"] for c in cells if c["status"] == "SUCCEEDED"]
+    if len(rows) < 3:
+        return None
+
+    # normal equations (X^T X) beta = X^T y, solved by Gaussian elimination
+    a = [[sum(r[i] * r[j] for r in rows) for j in range(3)] for i in range(3)]
+    b = [sum(r[i] * y for r, y in zip(rows, ys)) for i in range(3)]
+    try:
+        beta = _solve(a, b)
+    except ZeroDivisionError:
+        return None
+
+    task_overhead, per_file, per_byte = beta
+    return {
+        "task_overhead": task_overhead,
+        "per_file_overhead": per_file,
+        "throughput": 1 / per_byte if per_byte > 0 else None,
+    }
+
+
+def _solve(a, b):
+    n = len(b)
+    m = [row[:] + [v] for row, v in zip(a, b)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(m[r][col]))
+        if m[pivot][col] == 0:
+            raise ZeroDivisionError("singular matrix")
+        m[col], m[pivot] = m[pivot], m[col]
+        for r in range(n):
+            if r != col:
+                factor = m[r][col] / m[col][col]
+                m[r] = [x - factor * y for x, y in zip(m[r], m[col])]
+    return [m[i][n] / m[i][i] for i in range(n)]
+
+
+def results_path(source_endpoint, destination_endpoint):
+    return constants.BENCH_RESULTS_DIR / f"{source_endpoint}_{destination_endpoint}.json"
+
+
+def save_results(source_endpoint, destination_endpoint, cells, model):
+    path = results_path(source_endpoint, destination_endpoint)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps(
+            {
+                "source_endpoint": source_endpoint,
+                "destination_endpoint": destination_endpoint,
+                "measured_at": time.time(),
+                "cells": cells,
+                "model": model,
+            },
+            indent=2,
+        )
+    )
+    logger.debug(f"Saved benchmark results to {path}")
+    return path
+
+
+def load_results(source_endpoint, destination_endpoint):
+    """
+    Load the stored benchmark results for an endpoint pair, or ``None`` if
+    the pair has not been benchmarked. Other commands can use the fitted
+    ``model`` to choose defaults like task sizes or concurrency.
+    """
+    try:
+        return json.loads(results_path(source_endpoint, destination_endpoint).read_text())
+    except (OSError, ValueError):
+        return None
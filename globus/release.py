@@ -0,0 +1,98 @@
+import logging
+import re
+import time
+
+from . import constants
+from .utils import lazy_import
+
+htcondor = lazy_import("htcondor")
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+TRANSIENT = "transient"
+NEEDS_USER = "needs-user"
+USER_HOLD = "user-hold"
+PERMANENT = "permanent"
+
+RELEASE = "release"
+WAIT = "wait"
+KEEP = "keep"
+
+_TRANSIENT_PATTERNS = [re.compile(p, re.IGNORECASE) for p in constants.TRANSIENT_HOLD_PATTERNS]
+
+
+def classify_hold(job):
+    """
+    Decide why a held job is held, from its hold reason, exit code and the
+    attributes the CLI sets on it. Returns one of the hold classes defined
+    in this module.
+    """
+    if job.get("HoldReasonCode") == constants.USER_HOLD_REASON_CODE:
+        return USER_HOLD
+
+    # a flag holds the endpoint's id until it is activated, when it is set to Undefined
+    if any(
+        k.startswith(constants.ENDPOINT_ACTIVATION_REQUIRED) and isinstance(v, str) and v
+        for k, v in job.items()
+    ):
+        return NEEDS_USER
+
+    exit_code = job.get("ExitCode")
+    if exit_code == constants.NEEDS_USER_INPUT:
+        return NEEDS_USER
+    if exit_code == constants.TRANSIENT_ERROR:
+        return TRANSIENT
+
+    reason = job.get("HoldReason") or ""
+    if any(p.search(reason) for p in _TRANSIENT_PATTERNS):
+        return TRANSIENT
+
+    return PERMANENT
+
+
+def release_count(job):
+    count = job.get(constants.RELEASE_COUNT_ATTR, 0)
+    return count if isinstance(count, int) else 0
+
+
+def backoff(count, base, maximum):
+    """Seconds to leave a job held after it has been auto-released ``count`` times."""
+    return min(maximum, base * 2 ** count)
+
+
+def decide(job, max_releases, base, maximum, now=None):
+    """
+    Decide what the auto-release policy does with a held job.
+    Returns ``(hold_class, action, detail)``, where ``action`` is one of
+    ``RELEASE``, ``WAIT`` (retryable, but still backing off) or ``KEEP``.
+    """
+    if now is None:
+        now = time.time()
+
+    hold_class = classify_hold(job)
+    if hold_class != TRANSIENT:
+        return hold_class, KEEP, "not retryable"
+
+    count = release_count(job)
+    if count >= max_releases:
+        return hold_class, KEEP, f"already released {count} times"
+
+    held_for = now - job.get("EnteredCurrentStatus", now)
+    delay = backoff(count, base, maximum)
+    if held_for < delay:
+        return hold_class, WAIT, f"releasing in {int(delay - held_for)} seconds"
+
+    return hold_class, RELEASE, f"release {count + 1} of {max_releases}"
+
+
+def release_job(schedd, job, now=None):
+    """Release a job, recording the release in its job ad first."""
+    if now is None:
+        now = time.time()
+
+    constraint = f"ClusterId == {job.cluster_id} && ProcId == {job.proc_id}"
+    schedd.edit(constraint, constants.RELEASE_COUNT_ATTR, str(release_count(job) + 1))
+    schedd.edit(constraint, constants.LAST_RELEASE_ATTR, str(int(now)))
+    schedd.act(htcondor.JobAction.Release, constraint)
+    logger.info(f"Released job {job.cluster_id}.{job.proc_id}")
@@ -0,0 +1,120 @@
+import concurrent.futures
+import hashlib
+import logging
+import os
+import sqlite3
+from pathlib import Path
+
+from . import constants
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+
+def scan_tree(root, workers=constants.SCAN_WORKERS):
+    """
+    Walk the directory tree under ``root``, scanning up to ``workers``
+    directories concurrently with :func:`os.scandir`.
+    Yields ``(relative_path, size, mtime_ns)`` for every regular file.
+    Symbolic links are not followed.
+    """
+    root = os.path.abspath(root)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {pool.submit(_scan_dir, root)}
+        while pending:
+            done, pending = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                files, subdirs = future.result()
+                for path, size, mtime_ns in files:
+                    yield os.path.relpath(path, root), size, mtime_ns
+                pending.update(pool.submit(_scan_dir, d) for d in subdirs)
+
+
+def _scan_dir(path):
+    files = []
+    subdirs = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        stat = entry.stat(follow_symlinks=False)
+                        files.append((entry.path, stat.st_size, stat.st_mtime_ns))
+                except OSError as e:
+                    logger.warning(f"Could not stat {entry.path}: {e}")
+    except OSError as e:
+        logger.warning(f"Could not scan {path}: {e}")
+
+    return files, subdirs
+
+
+class ScanIndex:
+    """
+    A persistent record of the size and modification time of every file seen
+    by a previous scan, stored in an SQLite database.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path))
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER)"
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._db.close()
+
+    def load(self):
+        return {
+            path: (size, mtime_ns)
+            for path, size, mtime_ns in self._db.execute("SELECT path, size, mtime_ns FROM files")
+        }
+
+    def update(self, changed, removed):
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO files (path, size, mtime_ns) VALUES (?, ?, ?)", changed
+            )
+            self._db.executemany("DELETE FROM files WHERE path = ?", ((p,) for p in removed))
+
+        logger.debug(
+            f"Updated scan index {self.path} ({len(changed)} changed, {len(removed)} removed)"
+        )
+
+
+def changed_files(root, index, workers=constants.SCAN_WORKERS, update=True, full=False):
+    """
+    Scan ``root`` and yield the relative path of every file that is new or
+    whose size or modification time differs from what ``index`` recorded
+    (or of every file, if ``full`` is true).
+    If ``update`` is true, the index is brought up to date (including
+    forgetting removed files) once the scan finishes.
+    """
+    previous = index.load()
+    logger.debug(f"Loaded {len(previous)} entries from scan index {index.path}")
+
+    changed = []
+    for path, size, mtime_ns in scan_tree(root, workers=workers):
+        if previous.pop(path, None) != (size, mtime_ns) or full:
+            changed.append((path, size, mtime_ns))
+            yield path
+
+    if update:
+        index.update(changed, removed=previous.keys())
+
+
+def default_index_path(root, source_path, destination_path):
+    key = "\0".join((os.path.abspath(root), source_path, destination_path))
+    return constants.SCAN_INDEX_DIR / f"{hashlib.sha1(key.encode()).hexdigest()}.sqlite"
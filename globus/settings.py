@@ -2,7 +2,7 @@ import logging
 
 import toml
 
-from .constants import AUTH, BOOKMARKS, SETTINGS_FILE_DEFAULT_PATH
+from .constants import AUTH, BOOKMARKS, LOCAL_ROOTS, SETTINGS_FILE_DEFAULT_PATH
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
@@ -31,5 +31,6 @@ def load_settings(path=None):
 
     settings.setdefault(AUTH, {})
     settings.setdefault(BOOKMARKS, {})
+    settings.setdefault(LOCAL_ROOTS, {})
 
     return settings
@@ -0,0 +1,54 @@
+import logging
+
+from . import constants
+from .utils import lazy_import
+
+globus_sdk = lazy_import("globus_sdk")
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+
+def iter_marker_paginated(transfer_client, path, page_size=constants.RECORDS_PAGE_SIZE):
+    """
+    Yield the records of a marker-paginated Transfer API resource one page at
+    a time, so that only a single page is ever held in memory.
+    """
+    marker = None
+    while True:
+        params = {"limit": page_size}
+        if marker is not None:
+            params["marker"] = marker
+
+        response = transfer_client.get(path, params=params)
+        yield from response["DATA"]
+
+        marker = response.get("next_marker")
+        if not marker:
+            return
+
+
+def iter_skipped_errors(transfer_client, task_id):
+    """
+    Yield the records of files and directories that a task failed to transfer
+    and skipped over (tasks submitted with skip_source_errors).
+    """
+    yield from iter_marker_paginated(transfer_client, f"task/{task_id}/skipped_errors")
+
+
+def transfer_data_like(transfer_client, task, label=None):
+    """
+    Make an empty TransferData with the same endpoints and options as an existing task.
+    """
+    return globus_sdk.TransferData(
+        transfer_client,
+        task["source_endpoint_id"],
+        task["destination_endpoint_id"],
+        label=label,
+        sync_level=task.get("sync_level"),
+        verify_checksum=task.get("verify_checksum", True),
+        preserve_timestamp=task.get("preserve_timestamp", False),
+        encrypt_data=task.get("encrypt_data", False),
+        skip_source_errors=task.get("skip_source_errors", False),
+        fail_on_quota_errors=task.get("fail_on_quota_errors", False),
+    )
@@ -1,5 +1,43 @@
+import importlib
 import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    """
+    Stands in for a module, importing it on first attribute access.
+    Shell completion imports the whole CLI on every key press, and most
+    completions never touch globus_sdk or the HTCondor bindings, which are
+    slow to import.
+    """
+
+    def __getattr__(self, attr):
+        return getattr(importlib.import_module(self.__name__), attr)
+
+
+def lazy_import(name):
+    return sys.modules.get(name) or LazyModule(name)
 
 
 def is_interactive():
     return sys.stdin.isatty()
+
+
+def add_label_tag(label, tag, max_length=128):
+    """
+    Append a tag to a Globus task label, truncating the rest of the label
+    if needed so that the result fits within the label length limit.
+    """
+    if not label:
+        return tag
+    return f"{label[: max_length - len(tag) - 1]} {tag}"
+
+
+def label_has_tag(label, tag):
+    return tag in (label or "").split()
+
+
+def remove_label_tags(label, prefixes):
+    """Remove every tag starting with one of ``prefixes`` from a Globus task label."""
+    words = [w for w in (label or "").split() if not w.startswith(tuple(prefixes))]
+    return " ".join(words) or None
@@ -0,0 +1,203 @@
+import errno
+import os
+
+import pytest
+
+from globus import backends
+from globus.backends import BackendError, LocalBackend
+
+
+@pytest.fixture
+def roots(tmp_path):
+    src = tmp_path / "src"
+    dst = tmp_path / "dst"
+    src.mkdir()
+    dst.mkdir()
+    return src, dst
+
+
+@pytest.fixture
+def backend(roots):
+    src, dst = roots
+    return LocalBackend({"a": src, "b": dst}, workers=2)
+
+
+def task(*items, **options):
+    return {
+        "source_endpoint": "a",
+        "destination_endpoint": "b",
+        "DATA": [
+            {"source_path": s, "destination_path": d, "recursive": s.endswith("/")}
+            for s, d in items
+        ],
+        **options,
+    }
+
+
+def write(path, content, mtime=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def test_copies_directory_tree(backend, roots):
+    src, dst = roots
+    write(src / "dir" / "x", "x")
+    write(src / "dir" / "sub" / "y", "yy")
+    (src / "dir" / "empty").mkdir()
+
+    result = backend.run(task(("/dir/", "/out/")))
+
+    assert result["status"] == "SUCCEEDED"
+    assert result["files_transferred"] == 2
+    assert result["bytes_transferred"] == 3
+    assert (dst / "out" / "sub" / "y").read_text() == "yy"
+    assert (dst / "out" / "empty").is_dir()
+
+
+def test_plan_does_not_touch_destination(backend, roots):
+    src, dst = roots
+    write(src / "dir" / "sub" / "y", "y")
+
+    pairs, directories, faults = backend.plan(task(("/dir/", "/out/")))
+
+    assert pairs == [(src / "dir" / "sub" / "y", dst / "out" / "sub" / "y")]
+    assert dst / "out" / "sub" in directories
+    assert not (dst / "out").exists()
+
+
+@pytest.mark.parametrize(
+    "sync_level, dst_content, dst_mtime, copied",
+    [
+        ("exists", "different size", 2000, False),
+        ("size", "different size", 2000, True),
+        ("size", "old", 500, False),
+        ("mtime", "old", 500, True),
+        ("mtime", "old", 2000, False),
+        ("checksum", "old", 2000, True),
+        ("checksum", "new", 2000, False),
+        (None, "new", 2000, True),
+    ],
+)
+def test_sync_level(backend, roots, sync_level, dst_content, dst_mtime, copied):
+    src, dst = roots
+    write(src / "f", "new", mtime=1000)
+    write(dst / "f", dst_content, mtime=dst_mtime)
+
+    result = backend.run(task(("/f", "/f"), sync_level=sync_level))
+
+    assert result["files_transferred"] == (1 if copied else 0)
+    assert result["files_skipped"] == (0 if copied else 1)
+    assert (dst / "f").read_text() == ("new" if copied else dst_content)
+
+
+def test_sync_level_by_number(backend, roots):
+    src, dst = roots
+    write(src / "f", "new")
+    write(dst / "f", "old")
+
+    result = backend.run(task(("/f", "/f"), sync_level=backends.SYNC_LEVELS["size"]))
+
+    assert result["files_skipped"] == 1
+
+
+@pytest.mark.parametrize("preserve_timestamp", [True, False])
+def test_preserve_timestamp(backend, roots, preserve_timestamp):
+    src, dst = roots
+    write(src / "f", "x", mtime=1000)
+
+    backend.run(task(("/f", "/f"), preserve_timestamp=preserve_timestamp))
+
+    assert ((dst / "f").stat().st_mtime == 1000) is preserve_timestamp
+
+
+def test_verify_checksum_catches_corrupt_copies(backend, roots, monkeypatch):
+    src, dst = roots
+    write(src / "f", "x")
+
+    def corrupt_copy(src, dst, size):
+        dst.write_text("y")
+
+    monkeypatch.setattr(backends, "_copy", corrupt_copy)
+
+    result = backend.run(task(("/f", "/f"), verify_checksum=True))
+
+    assert result["status"] == "FAILED"
+    assert "checksum" in result["faults"][0]["error"]
+    assert not (dst / "f").exists()
+    assert list(dst.iterdir()) == []
+
+
+@pytest.mark.parametrize("skip_source_errors, status", [(True, "SUCCEEDED"), (False, "FAILED")])
+def test_skip_source_errors(backend, roots, skip_source_errors, status):
+    src, dst = roots
+    write(src / "f", "x")
+
+    result = backend.run(
+        task(("/f", "/f"), ("/missing", "/missing"), skip_source_errors=skip_source_errors)
+    )
+
+    assert result["status"] == status
+    assert result["files_transferred"] == 1
+    assert [f["source"] for f in result["faults"]] == [True]
+
+
+def test_falls_back_to_userspace_copy(backend, roots, monkeypatch):
+    src, dst = roots
+    write(src / "f", "x" * 10_000)
+
+    def refuse(*args):
+        raise OSError(errno.EXDEV, os.strerror(errno.EXDEV))
+
+    monkeypatch.setattr(backends, "_copy_file_range", refuse)
+    monkeypatch.setattr(backends, "_sendfile", refuse)
+
+    result = backend.run(task(("/f", "/f")))
+
+    assert result["status"] == "SUCCEEDED"
+    assert (dst / "f").read_text() == "x" * 10_000
+
+
+def test_symlinks_are_ignored_by_default(backend, roots):
+    src, dst = roots
+    write(src / "target", "x")
+    write(src / "other" / "g", "g")
+    write(src / "dir" / "f", "f")
+    (src / "dir" / "link").symlink_to(src / "target")
+    (src / "dir" / "linked_dir").symlink_to(src / "other")
+
+    result = backend.run(task(("/dir/", "/out/")))
+
+    assert result["status"] == "SUCCEEDED"
+    assert sorted(p.name for p in (dst / "out").iterdir()) == ["f"]
+
+
+def test_symlinks_are_followed_when_copying(backend, roots):
+    src, dst = roots
+    write(src / "target", "x")
+    write(src / "dir" / "f", "f")
+    (src / "dir" / "link").symlink_to(src / "target")
+
+    result = backend.run(task(("/dir/", "/out/"), recursive_symlinks="copy"))
+
+    assert (dst / "out" / "link").read_text() == "x"
+    assert not (dst / "out" / "link").is_symlink()
+    assert result["files_transferred"] == 2
+
+
+def test_keeping_symlinks_is_not_supported(backend):
+    with pytest.raises(BackendError):
+        backend.run(task(("/dir/", "/out/"), recursive_symlinks="keep"))
+
+
+@pytest.mark.parametrize("path", ["/../escape", "/dir/../../escape", "../escape"])
+def test_local_path_rejects_escapes(backend, path):
+    with pytest.raises(BackendError):
+        backend.local_path("a", path)
+
+
+def test_local_path_allows_dotdot_inside_root(backend, roots):
+    src, _ = roots
+
+    assert backend.local_path("a", "/dir/../f") == src / "f"
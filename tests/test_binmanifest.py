@@ -0,0 +1,48 @@
+import io
+import json
+
+import pytest
+
+from globus.binmanifest import BinaryManifest, BinaryManifestWriter, binary_to_json
+
+
+def make_entries(n):
+    return [
+        {
+            "DATA_TYPE": "file",
+            "name": f"dir_{idx % 7}/file_{idx}",
+            "type": "dir" if idx % 5 == 0 else "file",
+            "size": idx * 1024,
+            "last_modified": "2020-02-18 17:11:13+00:00",
+            "permissions": "0644",
+            "user": f"user_{idx % 3}",
+            "group": "group",
+        }
+        for idx in range(n)
+    ]
+
+
+@pytest.mark.parametrize("intern_table_size", [2, 1024])
+def test_round_trip(tmp_path, intern_table_size):
+    entries = make_entries(200)
+    path = tmp_path / "manifest.bin"
+
+    with BinaryManifestWriter(path, intern_table_size=intern_table_size) as writer:
+        for entry in entries:
+            writer.write(entry)
+
+    with BinaryManifest(path) as manifest:
+        assert list(manifest) == entries
+
+
+def test_binary_to_json(tmp_path):
+    entries = make_entries(10)
+    path = tmp_path / "manifest.bin"
+    with BinaryManifestWriter(path) as writer:
+        for entry in entries:
+            writer.write(entry)
+
+    out = io.StringIO()
+    binary_to_json(path, out, compact=True)
+
+    assert json.loads(out.getvalue()) == entries
@@ -0,0 +1,38 @@
+import pytest
+
+requests = pytest.importorskip("requests")
+globus_sdk = pytest.importorskip("globus_sdk")
+
+from globus import clients  # noqa: E402
+
+
+class Sent(Exception):
+    pass
+
+
+class RecordingSession(requests.Session):
+    def __init__(self):
+        super().__init__()
+        self.requests = []
+
+    def request(self, method, url, *args, **kwargs):
+        self.requests.append((method, url))
+        raise Sent()
+
+
+def test_use_session_routes_client_requests_through_session():
+    session = RecordingSession()
+    client = clients.use_session(globus_sdk.TransferClient(), session)
+
+    with pytest.raises(Sent):
+        client.get("/endpoint_search")
+
+    assert len(session.requests) == 1
+    method, url = session.requests[0]
+    assert method == "GET"
+    assert url.endswith("/endpoint_search")
+
+
+def test_use_session_rejects_clients_without_a_session():
+    with pytest.raises(RuntimeError):
+        clients.use_session(object(), requests.Session())
@@ -0,0 +1,24 @@
+from globus.coalesce import coalesce_specs, manifest_lister
+
+ENTRIES = [
+    {"name": "x.txt", "type": "file"},
+    {"name": "sub", "type": "dir"},
+    {"name": "sub/y", "type": "file"},
+]
+
+
+def test_coalesce_whole_tree():
+    specs = ["/a/x.txt:/d/x.txt", "/a/sub/y:/d/sub/y"]
+
+    new_specs, report = coalesce_specs(specs, manifest_lister(ENTRIES, "/a"))
+
+    assert new_specs == ["/a/:/d/"]
+    assert report["directories"] == 1
+
+
+def test_coalesce_keeps_subdirectories_sent_elsewhere():
+    specs = ["/a/x.txt:/d/x.txt", "/a/sub/y:/other/sub/y"]
+
+    new_specs, _ = coalesce_specs(specs, manifest_lister(ENTRIES, "/a"))
+
+    assert sorted(new_specs) == ["/a/sub/:/other/sub/", "/a/x.txt:/d/x.txt"]
@@ -0,0 +1,16 @@
+import pytest
+
+pytest.importorskip("classad")
+
+from globus import constants  # noqa: E402
+from globus.jobs import ProgressPublisher  # noqa: E402
+
+
+def test_progress_rate_only_counts_active_tasks():
+    publisher = ProgressPublisher(scratch_ad=None)
+    publisher._tasks = {
+        "a": {"task_id": "a", "status": "ACTIVE", "effective_bytes_per_second": 100},
+        "b": {"task_id": "b", "status": "SUCCEEDED", "effective_bytes_per_second": 1000},
+    }
+
+    assert publisher.attributes()[constants.PROGRESS_RATE_ATTR] == "100"
@@ -0,0 +1,27 @@
+from globus.logtail import FileFollower, tail_lines
+
+
+def test_tail_lines_with_predicate(tmp_path):
+    path = tmp_path / "log"
+    path.write_bytes(b"".join(f"line {n}\n".encode() for n in range(10_000)))
+
+    lines, offset = tail_lines(path, 2, predicate=lambda line: line.endswith("5"))
+
+    assert lines == ["line 9985", "line 9995"]
+    assert offset == path.stat().st_size
+
+
+def test_unfinished_last_line_is_followed_in_one_piece(tmp_path):
+    path = tmp_path / "log"
+    path.write_bytes(b"a\nb\npart")
+
+    lines, offset = tail_lines(path, 5)
+    follower = FileFollower(path, offset)
+
+    assert lines == ["a", "b"]
+    assert list(follower.lines()) == []
+
+    with open(path, "ab") as f:
+        f.write(b"ial\nc\n")
+
+    assert list(follower.lines()) == ["partial", "c"]
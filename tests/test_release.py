@@ -0,0 +1,85 @@
+import pytest
+
+from globus import constants
+from globus import release as policy
+
+NOW = 1_000_000
+
+
+def held(**attrs):
+    ad = {"JobStatus": 5, "HoldReasonCode": 3, "HoldReason": "", "EnteredCurrentStatus": NOW}
+    ad.update(attrs)
+    return ad
+
+
+def test_user_hold_is_kept():
+    job = held(HoldReasonCode=constants.USER_HOLD_REASON_CODE, HoldReason="timed out")
+
+    assert policy.classify_hold(job) == policy.USER_HOLD
+
+
+def test_pending_activation_needs_user():
+    job = held(**{f"{constants.ENDPOINT_ACTIVATION_REQUIRED}_0": "some-endpoint-id"})
+
+    assert policy.classify_hold(job) == policy.NEEDS_USER
+
+
+def test_cleared_activation_flag_is_ignored():
+    job = held(**{f"{constants.ENDPOINT_ACTIVATION_REQUIRED}_0": object()}, ExitCode=3)
+
+    assert policy.classify_hold(job) == policy.TRANSIENT
+
+
+@pytest.mark.parametrize(
+    "exit_code, hold_class",
+    [
+        (constants.NEEDS_USER_INPUT, policy.NEEDS_USER),
+        (constants.TRANSIENT_ERROR, policy.TRANSIENT),
+        (1, policy.PERMANENT),
+    ],
+)
+def test_exit_code(exit_code, hold_class):
+    assert policy.classify_hold(held(ExitCode=exit_code)) == hold_class
+
+
+@pytest.mark.parametrize(
+    "reason, hold_class",
+    [
+        ("Transfer timed out", policy.TRANSIENT),
+        ("Connection reset by peer", policy.TRANSIENT),
+        ("Globus returned HTTP 503", policy.TRANSIENT),
+        ("HTTP/1.1 429 Too Many Requests", policy.TRANSIENT),
+        ("Job exceeded memory usage 500 MB", policy.PERMANENT),
+        ("Permission denied", policy.PERMANENT),
+    ],
+)
+def test_hold_reason_patterns(reason, hold_class):
+    assert policy.classify_hold(held(HoldReason=reason)) == hold_class
+
+
+def test_backoff_doubles_up_to_the_maximum():
+    assert [policy.backoff(n, 10, 50) for n in range(4)] == [10, 20, 40, 50]
+
+
+def test_decide_waits_during_backoff_then_releases():
+    job = held(ExitCode=constants.TRANSIENT_ERROR, **{constants.RELEASE_COUNT_ATTR: 1})
+
+    _, action, _ = policy.decide(job, max_releases=5, base=10, maximum=100, now=NOW + 19)
+    assert action == policy.WAIT
+
+    _, action, _ = policy.decide(job, max_releases=5, base=10, maximum=100, now=NOW + 20)
+    assert action == policy.RELEASE
+
+
+def test_decide_stops_at_max_releases():
+    job = held(ExitCode=constants.TRANSIENT_ERROR, **{constants.RELEASE_COUNT_ATTR: 5})
+
+    hold_class, action, _ = policy.decide(job, max_releases=5, base=10, maximum=100, now=NOW * 2)
+
+    assert (hold_class, action) == (policy.TRANSIENT, policy.KEEP)
+
+
+def test_decide_keeps_permanent_holds():
+    _, action, _ = policy.decide(held(ExitCode=1), max_releases=5, base=10, maximum=100, now=NOW)
+
+    assert action == policy.KEEP
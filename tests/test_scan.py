@@ -0,0 +1,28 @@
+from globus.scan import ScanIndex, changed_files
+
+
+def make_tree(root, names):
+    for name in names:
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(name)
+
+
+def test_only_changed_files_are_emitted(tmp_path):
+    make_tree(tmp_path / "data", ["a", "sub/b"])
+
+    with ScanIndex(tmp_path / "index.sqlite") as idx:
+        assert sorted(changed_files(tmp_path / "data", idx)) == ["a", "sub/b"]
+        assert list(changed_files(tmp_path / "data", idx)) == []
+
+
+def test_full_without_updating_keeps_the_index(tmp_path):
+    make_tree(tmp_path / "data", ["a", "sub/b"])
+
+    with ScanIndex(tmp_path / "index.sqlite") as idx:
+        list(changed_files(tmp_path / "data", idx))
+        before = idx.load()
+
+        emitted = changed_files(tmp_path / "data", idx, update=False, full=True)
+        assert sorted(emitted) == ["a", "sub/b"]
+        assert idx.load() == before
@@ -0,0 +1,32 @@
+import sys
+
+from globus.utils import add_label_tag, label_has_tag, lazy_import, remove_label_tags
+
+
+def test_add_label_tag_truncates_to_fit():
+    label = add_label_tag("x" * 200, "fp-abc", max_length=128)
+
+    assert len(label) == 128
+    assert label_has_tag(label, "fp-abc")
+
+
+def test_remove_label_tags():
+    label = "nightly sync guard-0123 fp-4567"
+
+    assert remove_label_tags(label, ["guard-", "fp-"]) == "nightly sync"
+    assert remove_label_tags("guard-0123", ["guard-"]) is None
+    assert remove_label_tags(None, ["guard-"]) is None
+
+
+def test_lazy_import_defers_import_until_attribute_access():
+    sys.modules.pop("colorsys", None)
+
+    colorsys = lazy_import("colorsys")
+    assert "colorsys" not in sys.modules
+
+    assert colorsys.rgb_to_hsv(0, 0, 0) == (0, 0, 0)
+    assert "colorsys" in sys.modules
+
+
+def test_lazy_import_returns_already_imported_modules():
+    assert lazy_import("sys") is sys